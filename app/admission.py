@@ -0,0 +1,87 @@
+import logging
+from typing import Dict, Iterable, List
+from fastapi import HTTPException
+from redis.exceptions import RedisError
+from app.cache import TTLCache
+from app.celery_app import profile_for_operation, profile_queues
+from app.config import settings
+from app.models import TaskPriority
+from app.redis_client import get_broker_redis
+
+logger = logging.getLogger(__name__)
+
+# Broker queue lengths per profile, refreshed at most every few seconds
+_depth_cache = TTLCache(ttl=settings.admission_depth_cache_ttl)
+
+
+def _broker_keys(queue: str) -> List[str]:
+    """Redis lists holding a queue's messages, one per priority step"""
+    return [queue if not step else f"{queue}:{step}" for step in dict.fromkeys([0, *settings.celery_priority_steps])]
+
+
+async def broker_queue_depths(queues: Iterable[str]) -> Dict[str, int]:
+    """Messages waiting in each broker queue, read in one round trip"""
+    queues = list(queues)
+    async with get_broker_redis().pipeline(transaction=False) as pipe:
+        for queue in queues:
+            for key in _broker_keys(queue):
+                pipe.llen(key)
+        lengths = iter(await pipe.execute())
+
+    return {queue: sum(next(lengths) for _ in _broker_keys(queue)) for queue in queues}
+
+
+async def queue_depth(profile_name: str) -> int:
+    """Messages waiting in all queues of a profile"""
+    depth = _depth_cache.get(profile_name)
+    if depth is None:
+        depth = sum((await broker_queue_depths(profile_queues(profile_name))).values())
+        _depth_cache.set(profile_name, depth)
+    return depth
+
+
+def overloaded(detail: str) -> HTTPException:
+    return HTTPException(
+        status_code=429,
+        detail=detail,
+        headers={"Retry-After": str(settings.admission_retry_after)},
+    )
+
+
+async def admitted_priorities(operation: str) -> List[str]:
+    """
+    Task priorities that may still be dispatched for an operation.
+
+    Lower priorities have lower queue limits, so they are shed first as the
+    operation's backlog grows.
+    """
+    priorities = [priority.value for priority in TaskPriority]
+    if not settings.admission_enabled:
+        return priorities
+
+    try:
+        depth = await queue_depth(profile_for_operation(operation))
+    except RedisError as e:
+        # Admission control is best effort; don't block dispatch on it
+        logger.warning(f"Failed to read queue depth, admitting work: {str(e)}")
+        return priorities
+
+    return [
+        priority for priority in priorities
+        if depth < settings.admission_queue_limits.get(priority, depth + 1)
+    ]
+
+
+async def admit_maintenance():
+    """Reject a cleanup or report job with 429 while the maintenance queue is backed up"""
+    if not settings.admission_enabled:
+        return
+
+    try:
+        depth = await queue_depth("maintenance")
+    except RedisError as e:
+        logger.warning(f"Failed to read queue depth, admitting work: {str(e)}")
+        return
+
+    if depth >= settings.admission_maintenance_queue_limit:
+        raise overloaded("Maintenance queue is full, retry later")
\ No newline at end of file
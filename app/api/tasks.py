@@ -1,103 +1,364 @@
-from typing import List, Optional
-from fastapi import APIRouter, HTTPException, Query
+import asyncio
+import json
+import uuid
+from collections import Counter
+from typing import Optional, Union
+from bson import ObjectId
+from beanie import UpdateResponse
+from pymongo import ASCENDING
+from celery import group, states
+from fastapi import APIRouter, Header, HTTPException, Query
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from app.models import Task, TaskLog, TaskStatus, TaskPriority
-from app.schemas import TaskCreate, TaskUpdate, TaskResponse, TaskWithLogsResponse, CeleryTaskResponse
-from app.tasks import process_task, cleanup_old_tasks, generate_report
-from app.database import init_db
+from app.schemas import (
+    TaskCreate,
+    TaskUpdate,
+    TaskResponse,
+    TaskListResponse,
+    TaskSummaryResponse,
+    TaskSummaryListResponse,
+    TaskWithLogsResponse,
+    CeleryTaskResponse,
+    TaskBulkCreate,
+    TaskBulkCreateResponse,
+    TaskBatchProcessRequest,
+    TaskBatchProcessResponse,
+)
+from app.celery_app import celery_app, route_for_task
+from app.tasks import process_task, cleanup_old_tasks, cleanup_query, generate_report
+from app.cache import cached_stats, invalidate_tasks, task_cache, task_status_cache
+from app.config import settings
+from app.task_state import transition_task
+from app.idempotency import run_idempotent
+from app.admission import admit_maintenance, admitted_priorities, overloaded
+from app.events import publish_task_events, task_event_hub
+from app.pagination import KEYSET_SORT, ascending_keyset_filter, encode_cursor, keyset_page
+from app.serialization import from_mongo, parse_fields, select_fields, validated_response
+from app.export import (
+    EXPORT_MEDIA_TYPES,
+    TASK_EXPORT_FIELDS,
+    TASK_LOG_EXPORT_FIELDS,
+    ExportFormat,
+    export_documents,
+    time_range_filter,
+)
+from app.counters import (
+    get_task_counters,
+    increment_task_counters,
+    reconcile_task_counters,
+    record_priority_change,
+    record_status_change,
+    record_task_created,
+    record_task_deleted,
+)
 from datetime import datetime
 
 router = APIRouter(prefix="/tasks", tags=["tasks"])
 
 
+def _task_response(task: Task) -> dict:
+    """Validated, JSON-ready response body for a task document"""
+    return TaskResponse.model_validate({**task.model_dump(), "id": str(task.id)}).model_dump(mode="json")
+
+
 @router.post("/", response_model=TaskResponse)
-async def create_task(task_data: TaskCreate):
+async def create_task(
+    task_data: TaskCreate,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key", description="Repeated requests with the same key return the original response")
+):
     """Create a new task"""
-    await init_db()
-    
+    return await run_idempotent(
+        idempotency_key, "create_task", task_data.model_dump(mode="json"), lambda: _create_task(task_data)
+    )
+
+
+async def _create_task(task_data: TaskCreate) -> dict:
     # Create task in database
     task = Task(**task_data.dict())
     await task.insert()
+    await record_task_created(task.priority)
     
-    return task
+    return _task_response(task)
 
 
-@router.get("/", response_model=List[TaskResponse])
+@router.post("/bulk", response_model=TaskBulkCreateResponse)
+async def create_tasks_bulk(
+    bulk_data: TaskBulkCreate,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key", description="Repeated requests with the same key return the original response")
+):
+    """Create many tasks in a single insert"""
+    return await run_idempotent(
+        idempotency_key, "create_tasks_bulk", bulk_data.model_dump(mode="json"), lambda: _create_tasks_bulk(bulk_data)
+    )
+
+
+async def _create_tasks_bulk(bulk_data: TaskBulkCreate) -> dict:
+    if len(bulk_data.tasks) > settings.bulk_max_items:
+        raise HTTPException(status_code=400, detail=f"At most {settings.bulk_max_items} tasks per request")
+    
+    tasks = [Task(**task_data.dict()) for task_data in bulk_data.tasks]
+    result = await Task.insert_many(tasks)
+    for task, inserted_id in zip(tasks, result.inserted_ids):
+        task.id = inserted_id
+    
+    priorities = Counter(task.priority for task in tasks)
+    await increment_task_counters({TaskStatus.PENDING: len(tasks)}, priorities)
+    
+    return {"items": [_task_response(task) for task in tasks]}
+
+
+@router.get("/", response_model=Union[TaskListResponse, TaskSummaryListResponse])
 async def get_tasks(
-    skip: int = Query(0, ge=0, description="Number of tasks to skip"),
+    cursor: Optional[str] = Query(None, description="Cursor from the previous page's next_cursor"),
     limit: int = Query(10, ge=1, le=100, description="Number of tasks to return"),
     status: Optional[TaskStatus] = Query(None, description="Filter by task status"),
-    priority: Optional[TaskPriority] = Query(None, description="Filter by task priority")
+    priority: Optional[TaskPriority] = Query(None, description="Filter by task priority"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. id,title,status")
 ):
     """Get list of tasks with optional filtering"""
-    await init_db()
-    
     # Build query
     query = {}
     if status:
-        query["status"] = status
+        query["status"] = status.value
     if priority:
-        query["priority"] = priority
-    
-    tasks = await Task.find(query).skip(skip).limit(limit).to_list()
-    return tasks
+        query["priority"] = priority.value
+    
+    return await keyset_page(
+        Task.get_motor_collection(),
+        query,
+        cursor,
+        limit,
+        fields,
+        TaskResponse,
+        TaskListResponse,
+        TaskSummaryListResponse,
+    )
+
+
+@router.get("/export")
+async def export_tasks(
+    format: ExportFormat = Query(ExportFormat.NDJSON, description="Export format"),
+    status: Optional[TaskStatus] = Query(None, description="Filter by task status"),
+    priority: Optional[TaskPriority] = Query(None, description="Filter by task priority"),
+    created_after: Optional[datetime] = Query(None, description="Only tasks created at or after this time"),
+    created_before: Optional[datetime] = Query(None, description="Only tasks created before this time"),
+    batch_size: Optional[int] = Query(None, ge=1, le=10000, description="Tasks fetched per database round trip")
+):
+    """Stream all matching tasks, newest first, as NDJSON or CSV"""
+    query = {}
+    if status:
+        query["status"] = status.value
+    if priority:
+        query["priority"] = priority.value
+    query.update(time_range_filter("created_at", created_after, created_before))
+    
+    return _export_response(
+        export_documents(
+            Task.get_motor_collection(),
+            query,
+            KEYSET_SORT,
+            TASK_EXPORT_FIELDS,
+            format,
+            batch_size,
+        ),
+        format,
+        "tasks",
+    )
 
 
-@router.get("/{task_id}", response_model=TaskResponse)
-async def get_task(task_id: str):
+def _export_response(rows, export_format: ExportFormat, filename: str) -> StreamingResponse:
+    return StreamingResponse(
+        rows,
+        media_type=EXPORT_MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{export_format.value}"'},
+    )
+
+
+@router.get("/{task_id}", response_model=Union[TaskResponse, TaskSummaryResponse])
+async def get_task(
+    task_id: str,
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. id,title,status")
+):
     """Get a specific task by ID"""
-    await init_db()
+    selected = parse_fields(fields, TaskResponse)
     
-    task = await Task.get(task_id)
+    task = await task_cache.get_or_load(task_id, lambda: _load_task(task_id))
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
     
-    return task
+    # Cached tasks are already validated
+    return ORJSONResponse(select_fields(task, selected) if selected else task)
+
+
+async def _load_task(task_id: str) -> Optional[dict]:
+    """Load a task as a cacheable, validated dict"""
+    if not ObjectId.is_valid(task_id):
+        return None
+    doc = await Task.get_motor_collection().find_one({"_id": ObjectId(task_id)})
+    return TaskResponse.model_validate(from_mongo(doc)).model_dump(mode="json") if doc else None
 
 
 @router.get("/{task_id}/with-logs", response_model=TaskWithLogsResponse)
-async def get_task_with_logs(task_id: str):
-    """Get a task with its execution logs"""
-    await init_db()
+async def get_task_with_logs(
+    task_id: str,
+    limit: int = Query(100, ge=1, le=1000, description="Number of log entries to return"),
+    cursor: Optional[str] = Query(None, description="Cursor from the previous page's next_logs_cursor"),
+    since: Optional[datetime] = Query(None, description="Only entries logged at or after this time"),
+    level: Optional[str] = Query(None, description="Filter by log level")
+):
+    """Get a task with a page of its execution logs, oldest first"""
+    if not ObjectId.is_valid(task_id):
+        raise HTTPException(status_code=404, detail="Task not found")
     
-    task = await Task.get(task_id)
-    if not task:
+    log_query = {}
+    if level:
+        log_query["level"] = level
+    log_query.update(time_range_filter("timestamp", since, None))
+    log_query.update(ascending_keyset_filter(cursor, "timestamp"))
+    
+    # Fetch the task and one extra log entry, to know whether another page
+    # exists, in a single round trip
+    pipeline = [
+        {"$match": {"_id": ObjectId(task_id)}},
+        {
+            "$lookup": {
+                "from": TaskLog.get_motor_collection().name,
+                "let": {"task_id": {"$toString": "$_id"}},
+                "pipeline": [
+                    {"$match": {"$expr": {"$eq": ["$task_id", "$$task_id"]}, **log_query}},
+                    {"$sort": {"timestamp": 1, "_id": 1}},
+                    {"$limit": limit + 1},
+                ],
+                "as": "logs",
+            }
+        },
+    ]
+    docs = await Task.get_motor_collection().aggregate(pipeline).to_list(1)
+    if not docs:
         raise HTTPException(status_code=404, detail="Task not found")
     
-    # Get task logs
-    logs = await TaskLog.find(TaskLog.task_id == task_id).to_list()
+    task = from_mongo(docs[0])
+    logs = task.pop("logs")
+    
+    next_logs_cursor = None
+    if len(logs) > limit:
+        logs = logs[:limit]
+        next_logs_cursor = encode_cursor(logs[-1]["timestamp"], logs[-1]["_id"])
     
-    # Create response with logs
-    task_dict = task.dict()
-    task_dict["logs"] = logs
+    task["logs"] = [from_mongo(log) for log in logs]
+    task["next_logs_cursor"] = next_logs_cursor
     
-    return task_dict
+    return validated_response(TaskWithLogsResponse, task)
+
+
+@router.get("/{task_id}/logs/export")
+async def export_task_logs(
+    task_id: str,
+    format: ExportFormat = Query(ExportFormat.NDJSON, description="Export format"),
+    level: Optional[str] = Query(None, description="Filter by log level"),
+    since: Optional[datetime] = Query(None, description="Only entries logged at or after this time"),
+    until: Optional[datetime] = Query(None, description="Only entries logged before this time"),
+    batch_size: Optional[int] = Query(None, ge=1, le=10000, description="Entries fetched per database round trip")
+):
+    """Stream a task's logs, oldest first, as NDJSON or CSV"""
+    task = await task_cache.get_or_load(task_id, lambda: _load_task(task_id))
+    if not task:
+        raise HTTPException(status_code=404, detail="Task not found")
+    
+    query = {"task_id": task_id}
+    if level:
+        query["level"] = level
+    query.update(time_range_filter("timestamp", since, until))
+    
+    return _export_response(
+        export_documents(
+            TaskLog.get_motor_collection(),
+            query,
+            [("timestamp", ASCENDING), ("_id", ASCENDING)],
+            TASK_LOG_EXPORT_FIELDS,
+            format,
+            batch_size,
+        ),
+        format,
+        f"task-{task_id}-logs",
+    )
+
+
+@router.get("/{task_id}/events")
+async def stream_task_events(task_id: str):
+    """Stream task status changes and new log entries as Server-Sent Events"""
+    task = await task_cache.get_or_load(task_id, lambda: _load_task(task_id))
+    if not task:
+        raise HTTPException(status_code=404, detail="Task not found")
+    
+    return StreamingResponse(
+        _task_event_stream(task_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+async def _task_event_stream(task_id: str):
+    """Yield SSE frames for a task until it finishes"""
+    finished = {TaskStatus.COMPLETED.value, TaskStatus.FAILED.value}
+    
+    async with task_event_hub.subscribe(task_id) as queue:
+        # Read the current state after subscribing so no transition is missed
+        task = await _load_task(task_id)
+        if not task:
+            yield _sse("error", {"detail": "Task not found"})
+            return
+        
+        yield _sse("status", {"status": task["status"], "updated_at": task["updated_at"]})
+        if task["status"] in finished:
+            return
+        
+        while True:
+            try:
+                message = await asyncio.wait_for(queue.get(), timeout=settings.task_events_heartbeat)
+            except asyncio.TimeoutError:
+                # Comment frame keeps proxies from closing an idle connection
+                yield ": keepalive\n\n"
+                continue
+            
+            yield _sse(message["event"], message["data"])
+            if message["event"] == "status" and message["data"].get("status") in finished:
+                return
 
 
 @router.put("/{task_id}", response_model=TaskResponse)
 async def update_task(task_id: str, task_data: TaskUpdate):
     """Update a task"""
-    await init_db()
-    
-    task = await Task.get(task_id)
+    # Update only provided fields, in one round trip
+    update_data = task_data.dict(exclude_unset=True)
+    update_data["updated_at"] = datetime.utcnow()
+    
+    task = None
+    if ObjectId.is_valid(task_id):
+        task = await Task.find_one(Task.id == ObjectId(task_id)).update(
+            {"$set": update_data},
+            response_type=UpdateResponse.OLD_DOCUMENT,
+        )
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
     
-    # Update only provided fields
-    update_data = task_data.dict(exclude_unset=True)
+    old_priority = task.priority
     for field, value in update_data.items():
         setattr(task, field, value)
     
-    task.updated_at = datetime.utcnow()
-    await task.save()
+    await record_priority_change(old_priority, task.priority)
+    await invalidate_tasks(task_id)
     
-    return task
+    return _task_response(task)
 
 
 @router.delete("/{task_id}")
 async def delete_task(task_id: str):
     """Delete a task and its logs"""
-    await init_db()
-    
     task = await Task.get(task_id)
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
@@ -107,6 +368,8 @@ async def delete_task(task_id: str):
     
     # Delete task
     await task.delete()
+    await record_task_deleted(task.status, task.priority)
+    await invalidate_tasks(task_id)
     
     return {"message": "Task deleted successfully"}
 
@@ -114,61 +377,232 @@ async def delete_task(task_id: str):
 @router.post("/{task_id}/process", response_model=CeleryTaskResponse)
 async def start_task_processing(
     task_id: str,
-    operation: str = Query("default", description="Type of operation to perform")
+    operation: str = Query("default", description="Type of operation to perform"),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key", description="Repeated requests with the same key return the original response")
 ):
     """Start processing a task with Celery"""
-    await init_db()
-    
-    task = await Task.get(task_id)
-    if not task:
-        raise HTTPException(status_code=404, detail="Task not found")
-    
-    if task.status != TaskStatus.PENDING:
+    # A retried request gets the original Celery task ID back instead of
+    # dispatching again
+    return await run_idempotent(
+        idempotency_key,
+        f"process_task:{task_id}",
+        {"operation": operation},
+        lambda: _start_task_processing(task_id, operation),
+    )
+
+
+async def _start_task_processing(task_id: str, operation: str) -> dict:
+    # Shed work while the operation's queues are backed up, low priority first
+    admitted = await admitted_priorities(operation)
+    if not admitted:
+        raise overloaded(f"Queues for {operation} are full, retry later")
+    
+    # Claim the task and assign its Celery task ID in one compare-and-set,
+    # so concurrent requests can't dispatch it twice
+    celery_task_id = str(uuid.uuid4())
+    claimed = await transition_task(
+        task_id,
+        [TaskStatus.PENDING],
+        TaskStatus.PROCESSING,
+        condition={"priority": {"$in": admitted}},
+        celery_task_id=celery_task_id,
+    )
+    if claimed is None:
+        task = await Task.get(task_id)
+        if not task:
+            raise HTTPException(status_code=404, detail="Task not found")
+        if task.status == TaskStatus.PENDING:
+            raise overloaded(f"Queues for {operation} are full for {task.priority.value} priority tasks, retry later")
         raise HTTPException(status_code=400, detail="Task is not in pending status")
     
     # Start Celery task
-    celery_task = process_task.delay(task_id, operation)
-    
-    # Update task with Celery task ID
-    task.celery_task_id = celery_task.id
-    task.status = TaskStatus.PROCESSING
-    task.updated_at = datetime.utcnow()
-    await task.save()
+    try:
+        process_task.apply_async(
+            (task_id, operation), task_id=celery_task_id, **route_for_task(operation, claimed["priority"])
+        )
+    except Exception:
+        # Release the claim so the task can be dispatched again
+        await transition_task(
+            task_id,
+            [TaskStatus.PROCESSING],
+            TaskStatus.PENDING,
+            condition={"celery_task_id": celery_task_id},
+            celery_task_id=None,
+        )
+        raise HTTPException(status_code=503, detail="Failed to publish task to Celery")
     
     return {
-        "task_id": celery_task.id,
-        "status": celery_task.status,
+        "task_id": celery_task_id,
+        "status": states.PENDING,
         "result": None
     }
 
 
+@router.post("/process-batch", response_model=TaskBatchProcessResponse)
+async def start_batch_processing(
+    batch: TaskBatchProcessRequest,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key", description="Repeated requests with the same key return the original response")
+):
+    """Start processing many pending tasks with one update and one Celery group"""
+    return await run_idempotent(
+        idempotency_key, "process_batch", batch.model_dump(mode="json"), lambda: _start_batch_processing(batch)
+    )
+
+
+async def _start_batch_processing(batch: TaskBatchProcessRequest) -> dict:
+    # Keep request order, ignoring repeated IDs
+    task_ids = list(dict.fromkeys(batch.task_ids))
+    if len(task_ids) > settings.bulk_max_items:
+        raise HTTPException(status_code=400, detail=f"At most {settings.bulk_max_items} tasks per request")
+    
+    object_ids = {task_id: ObjectId(task_id) for task_id in task_ids if ObjectId.is_valid(task_id)}
+    
+    # Shed work while the operation's queues are backed up, low priority first
+    admitted = await admitted_priorities(batch.operation)
+    if not admitted:
+        raise overloaded(f"Queues for {batch.operation} are full, retry later")
+    
+    # Claim every pending task in one update. Each claimed task gets a Celery
+    # task ID derived from the batch ID, so claims are identifiable afterwards
+    batch_id = uuid.uuid4().hex
+    collection = Task.get_motor_collection()
+    await collection.update_many(
+        {"_id": {"$in": list(object_ids.values())}, "status": TaskStatus.PENDING.value, "priority": {"$in": admitted}},
+        [
+            {
+                "$set": {
+                    "status": TaskStatus.PROCESSING.value,
+                    "celery_task_id": {"$concat": [batch_id, "-", {"$toString": "$_id"}]},
+                    "updated_at": datetime.utcnow(),
+                }
+            }
+        ],
+    )
+    
+    found = {}
+    async for doc in collection.find(
+        {"_id": {"$in": list(object_ids.values())}},
+        projection={"celery_task_id": 1, "priority": 1, "status": 1},
+    ):
+        found[str(doc["_id"])] = doc
+    
+    claimed = {
+        task_id: doc["celery_task_id"]
+        for task_id, doc in found.items()
+        if doc.get("celery_task_id") and doc["celery_task_id"].startswith(f"{batch_id}-")
+    }
+    
+    if claimed:
+        try:
+            group(
+                process_task.signature(
+                    (task_id, batch.operation),
+                    task_id=celery_task_id,
+                    **route_for_task(batch.operation, found[task_id].get("priority")),
+                )
+                for task_id, celery_task_id in claimed.items()
+            ).apply_async()
+        except Exception:
+            # Release the claims so the tasks can be dispatched again
+            await collection.update_many(
+                {"celery_task_id": {"$in": list(claimed.values())}, "status": TaskStatus.PROCESSING.value},
+                {"$set": {"status": TaskStatus.PENDING.value, "celery_task_id": None, "updated_at": datetime.utcnow()}},
+            )
+            raise HTTPException(status_code=503, detail="Failed to publish tasks to Celery")
+        
+        await record_status_change(TaskStatus.PENDING, TaskStatus.PROCESSING, count=len(claimed))
+        await invalidate_tasks(*claimed.keys())
+        await publish_task_events(
+            (task_id, "status", {"status": TaskStatus.PROCESSING.value, "previous_status": TaskStatus.PENDING.value})
+            for task_id in claimed
+        )
+    
+    results = []
+    for task_id in task_ids:
+        if task_id not in object_ids:
+            results.append({"task_id": task_id, "status": "invalid_id"})
+        elif task_id in claimed:
+            results.append({"task_id": task_id, "status": "dispatched", "celery_task_id": claimed[task_id]})
+        elif task_id in found and found[task_id]["status"] == TaskStatus.PENDING.value:
+            results.append({"task_id": task_id, "status": "throttled"})
+        elif task_id in found:
+            results.append({"task_id": task_id, "status": "not_pending"})
+        else:
+            results.append({"task_id": task_id, "status": "not_found"})
+    
+    return {"dispatched": len(claimed), "results": results}
+
+
 @router.get("/{task_id}/celery-status", response_model=CeleryTaskResponse)
 async def get_celery_task_status(task_id: str):
     """Get the status of a Celery task"""
-    await init_db()
-    
-    task = await Task.get(task_id)
+    return await task_status_cache.get_or_load(task_id, lambda: _load_celery_task_status(task_id))
+
+
+# Celery state reported for each task status
+CELERY_STATES = {
+    TaskStatus.PENDING.value: states.PENDING,
+    TaskStatus.PROCESSING.value: states.STARTED,
+    TaskStatus.COMPLETED.value: states.SUCCESS,
+    TaskStatus.FAILED.value: states.FAILURE,
+}
+
+
+async def _load_celery_task_status(task_id: str) -> dict:
+    """Look up the Celery task status for a task from its Mongo document"""
+    task = None
+    if ObjectId.is_valid(task_id):
+        task = await Task.get_motor_collection().find_one(
+            {"_id": ObjectId(task_id)},
+            projection={"status": 1, "celery_task_id": 1, "result": 1, "error_message": 1},
+        )
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
     
-    if not task.celery_task_id:
+    if not task.get("celery_task_id"):
         raise HTTPException(status_code=400, detail="Task has no associated Celery task")
     
-    # Get Celery task status
-    from app.celery_app import celery_app
-    celery_task = celery_app.AsyncResult(task.celery_task_id)
+    # A task is marked processing when it is queued; only the result
+    # backend knows whether a worker has picked it up yet
+    if (
+        task["status"] == TaskStatus.PROCESSING.value
+        and settings.celery_status_backend_fallback
+        and not settings.celery_ignore_results
+    ):
+        celery_task = celery_app.AsyncResult(task["celery_task_id"])
+        if not celery_task.ready():
+            return {"task_id": celery_task.id, "status": celery_task.status, "result": None}
+    
+    result = None
+    if task["status"] == TaskStatus.COMPLETED.value:
+        result = task.get("result")
+    elif task["status"] == TaskStatus.FAILED.value:
+        result = task.get("error_message")
     
     return {
-        "task_id": celery_task.id,
-        "status": celery_task.status,
-        "result": celery_task.result if celery_task.ready() else None
+        "task_id": task["celery_task_id"],
+        "status": CELERY_STATES[task["status"]],
+        "result": result
     }
 
 
 @router.post("/cleanup")
-async def cleanup_tasks(days_old: int = Query(30, ge=1, description="Delete tasks older than this many days")):
+async def cleanup_tasks(
+    days_old: int = Query(30, ge=1, description="Delete tasks older than this many days"),
+    dry_run: bool = Query(False, description="Only count the tasks that would be deleted"),
+    batch_size: Optional[int] = Query(None, ge=1, le=10000, description="Tasks deleted per batch"),
+    resume: bool = Query(True, description="Continue from the last checkpoint of an interrupted run")
+):
     """Clean up old completed tasks"""
-    celery_task = cleanup_old_tasks.delay(days_old)
+    if dry_run:
+        matching = await Task.get_motor_collection().count_documents(cleanup_query(days_old))
+        return {
+            "message": f"{matching} tasks would be deleted",
+            "matching_tasks": matching
+        }
+    
+    await admit_maintenance()
+    celery_task = cleanup_old_tasks.delay(days_old, batch_size, resume)
     
     return {
         "message": "Cleanup task started",
@@ -181,6 +615,7 @@ async def start_report_generation(
     report_type: str = Query("daily", description="Type of report to generate")
 ):
     """Generate a report"""
+    await admit_maintenance()
     celery_task = generate_report.delay(report_type)
     
     return {
@@ -190,32 +625,27 @@ async def start_report_generation(
 
 
 @router.get("/stats/summary")
-async def get_task_stats():
+async def get_task_stats(
+    estimated: bool = Query(False, description="Use the collection size estimate and a longer-lived cache")
+):
     """Get task statistics"""
-    await init_db()
-    
-    # Get counts by status
-    pending_count = await Task.find(Task.status == TaskStatus.PENDING).count()
-    processing_count = await Task.find(Task.status == TaskStatus.PROCESSING).count()
-    completed_count = await Task.find(Task.status == TaskStatus.COMPLETED).count()
-    failed_count = await Task.find(Task.status == TaskStatus.FAILED).count()
-    
-    # Get counts by priority
-    low_count = await Task.find(Task.priority == TaskPriority.LOW).count()
-    medium_count = await Task.find(Task.priority == TaskPriority.MEDIUM).count()
-    high_count = await Task.find(Task.priority == TaskPriority.HIGH).count()
+    return await cached_stats("tasks", estimated, _compute_task_stats)
+
+
+async def _compute_task_stats(estimated: bool = False) -> dict:
+    """Read task counts from the materialized counters document"""
+    counts = await get_task_counters()
+    if counts is None:
+        # First request after deployment: build the counters from source
+        counts = await reconcile_task_counters()
+    
+    if estimated:
+        total_tasks = await Task.get_motor_collection().estimated_document_count()
+    else:
+        total_tasks = sum(counts["by_status"].values())
     
     return {
-        "total_tasks": pending_count + processing_count + completed_count + failed_count,
-        "by_status": {
-            "pending": pending_count,
-            "processing": processing_count,
-            "completed": completed_count,
-            "failed": failed_count
-        },
-        "by_priority": {
-            "low": low_count,
-            "medium": medium_count,
-            "high": high_count
-        }
-    } 
\ No newline at end of file
+        "total_tasks": total_tasks,
+        "by_status": counts["by_status"],
+        "by_priority": counts["by_priority"]
+    }
\ No newline at end of file
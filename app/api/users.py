@@ -1,122 +1,214 @@
-from typing import List, Optional
+from typing import Optional, Union
+from bson import ObjectId
+from beanie import PydanticObjectId, UpdateResponse
 from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import ORJSONResponse
+from pymongo.errors import BulkWriteError, DuplicateKeyError
 from app.models import User
-from app.schemas import UserCreate, UserUpdate, UserResponse
-from app.database import init_db
+from app.schemas import (
+    UserCreate,
+    UserBulkCreate,
+    UserBulkCreateResponse,
+    UserUpdate,
+    UserResponse,
+    UserListResponse,
+    UserSummaryResponse,
+    UserSummaryListResponse,
+)
+from app.cache import cached_stats, user_cache
+from app.pagination import keyset_page
+from app.serialization import from_mongo, parse_fields, select_fields, validated_response
+from app.config import settings
 from datetime import datetime
 
 router = APIRouter(prefix="/users", tags=["users"])
 
 
+def _duplicate_detail(error: dict) -> str:
+    """Describe a duplicate key error from the unique username or email index"""
+    key_pattern = error.get("keyPattern") or {}
+    if "username" in key_pattern:
+        return "Username already exists"
+    if "email" in key_pattern:
+        return "Email already exists"
+    return "User already exists"
+
+
+def _user_response(user: User) -> dict:
+    """Validated, JSON-ready response body for a user document"""
+    return UserResponse.model_validate({**user.model_dump(), "id": str(user.id)}).model_dump(mode="json")
+
+
 @router.post("/", response_model=UserResponse)
 async def create_user(user_data: UserCreate):
     """Create a new user"""
-    await init_db()
-    
-    # Check if username already exists
-    existing_user = await User.find_one(User.username == user_data.username)
-    if existing_user:
-        raise HTTPException(status_code=400, detail="Username already exists")
-    
-    # Check if email already exists
-    existing_email = await User.find_one(User.email == user_data.email)
-    if existing_email:
-        raise HTTPException(status_code=400, detail="Email already exists")
-    
-    # Create user
+    # The unique indexes on username and email reject duplicates
     user = User(**user_data.dict())
-    await user.insert()
+    try:
+        await user.insert()
+    except DuplicateKeyError as e:
+        raise HTTPException(status_code=400, detail=_duplicate_detail(e.details or {}))
     
-    return user
+    return _user_response(user)
+
 
+@router.post("/bulk", response_model=UserBulkCreateResponse)
+async def create_users_bulk(bulk_data: UserBulkCreate):
+    """Create many users in one unordered insert, reporting duplicates per row"""
+    if len(bulk_data.users) > settings.bulk_max_items:
+        raise HTTPException(status_code=400, detail=f"At most {settings.bulk_max_items} users per request")
+    
+    # IDs are assigned up front so every inserted row can be reported
+    users = [User(**user_data.dict()) for user_data in bulk_data.users]
+    for user in users:
+        user.id = PydanticObjectId()
+    
+    # Unordered, so one duplicate doesn't stop the rest of the batch
+    errors = {}
+    try:
+        await User.insert_many(users, ordered=False)
+    except BulkWriteError as e:
+        errors = {error["index"]: error for error in e.details.get("writeErrors", [])}
+    
+    results = []
+    for index, user in enumerate(users):
+        error = errors.get(index)
+        if error is None:
+            results.append({"index": index, "status": "created", "id": str(user.id)})
+        elif error.get("code") == 11000:
+            results.append({"index": index, "status": "duplicate", "detail": _duplicate_detail(error)})
+        else:
+            results.append({"index": index, "status": "error", "detail": error.get("errmsg")})
+    
+    return validated_response(
+        UserBulkCreateResponse, {"created": len(users) - len(errors), "results": results}
+    )
 
-@router.get("/", response_model=List[UserResponse])
+
+@router.get("/", response_model=Union[UserListResponse, UserSummaryListResponse])
 async def get_users(
-    skip: int = Query(0, ge=0, description="Number of users to skip"),
+    cursor: Optional[str] = Query(None, description="Cursor from the previous page's next_cursor"),
     limit: int = Query(10, ge=1, le=100, description="Number of users to return"),
-    is_active: Optional[bool] = Query(None, description="Filter by active status")
+    is_active: Optional[bool] = Query(None, description="Filter by active status"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. id,username")
 ):
     """Get list of users with optional filtering"""
-    await init_db()
-    
     # Build query
     query = {}
     if is_active is not None:
         query["is_active"] = is_active
     
-    users = await User.find(query).skip(skip).limit(limit).to_list()
-    return users
+    return await keyset_page(
+        User.get_motor_collection(),
+        query,
+        cursor,
+        limit,
+        fields,
+        UserResponse,
+        UserListResponse,
+        UserSummaryListResponse,
+    )
 
 
-@router.get("/{user_id}", response_model=UserResponse)
-async def get_user(user_id: str):
+@router.get("/{user_id}", response_model=Union[UserResponse, UserSummaryResponse])
+async def get_user(
+    user_id: str,
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. id,username")
+):
     """Get a specific user by ID"""
-    await init_db()
+    selected = parse_fields(fields, UserResponse)
     
-    user = await User.get(user_id)
+    user = await user_cache.get_or_load(user_id, lambda: _load_user(user_id))
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     
-    return user
+    # Cached users are already validated
+    return ORJSONResponse(select_fields(user, selected) if selected else user)
+
+
+async def _load_user(user_id: str) -> Optional[dict]:
+    """Load a user as a cacheable, validated dict"""
+    if not ObjectId.is_valid(user_id):
+        return None
+    doc = await User.get_motor_collection().find_one({"_id": ObjectId(user_id)})
+    return UserResponse.model_validate(from_mongo(doc)).model_dump(mode="json") if doc else None
 
 
 @router.put("/{user_id}", response_model=UserResponse)
 async def update_user(user_id: str, user_data: UserUpdate):
     """Update a user"""
-    await init_db()
-    
-    user = await User.get(user_id)
+    # Update only provided fields, in one round trip; the unique indexes
+    # on username and email reject conflicts
+    update_data = user_data.dict(exclude_unset=True)
+    update_data["updated_at"] = datetime.utcnow()
+    
+    user = None
+    if ObjectId.is_valid(user_id):
+        try:
+            user = await User.find_one(User.id == ObjectId(user_id)).update(
+                {"$set": update_data},
+                response_type=UpdateResponse.NEW_DOCUMENT,
+            )
+        except DuplicateKeyError as e:
+            raise HTTPException(status_code=400, detail=_duplicate_detail(e.details or {}))
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     
-    # Check for username conflicts if username is being updated
-    if user_data.username and user_data.username != user.username:
-        existing_user = await User.find_one(User.username == user_data.username)
-        if existing_user:
-            raise HTTPException(status_code=400, detail="Username already exists")
+    await user_cache.invalidate(user_id)
     
-    # Check for email conflicts if email is being updated
-    if user_data.email and user_data.email != user.email:
-        existing_email = await User.find_one(User.email == user_data.email)
-        if existing_email:
-            raise HTTPException(status_code=400, detail="Email already exists")
-    
-    # Update only provided fields
-    update_data = user_data.dict(exclude_unset=True)
-    for field, value in update_data.items():
-        setattr(user, field, value)
-    
-    user.updated_at = datetime.utcnow()
-    await user.save()
-    
-    return user
+    return _user_response(user)
 
 
 @router.delete("/{user_id}")
 async def delete_user(user_id: str):
     """Delete a user"""
-    await init_db()
-    
     user = await User.get(user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     
     await user.delete()
+    await user_cache.invalidate(user_id)
     
     return {"message": "User deleted successfully"}
 
 
 @router.get("/stats/summary")
-async def get_user_stats():
+async def get_user_stats(
+    estimated: bool = Query(False, description="Use the collection size estimate and a longer-lived cache")
+):
     """Get user statistics"""
-    await init_db()
-    
-    total_users = await User.count()
-    active_users = await User.find(User.is_active == True).count()
-    inactive_users = await User.find(User.is_active == False).count()
-    
+    return await cached_stats("users", estimated, _compute_user_stats)
+
+
+async def _compute_user_stats(estimated: bool = False) -> dict:
+    """Count users by active status, estimating the total from collection metadata if asked"""
+    if estimated:
+        # Skip the full scan: the total comes from metadata, the inactive
+        # count from the (is_active, created_at, _id) index
+        collection = User.get_motor_collection()
+        total_users = await collection.estimated_document_count()
+        inactive_users = await collection.count_documents({"is_active": False})
+        return {
+            "total_users": total_users,
+            "active_users": max(total_users - inactive_users, 0),
+            "inactive_users": inactive_users
+        }
+
+    pipeline = [
+        {
+            "$group": {
+                "_id": None,
+                "total": {"$sum": 1},
+                "active": {"$sum": {"$cond": [{"$eq": ["$is_active", True]}, 1, 0]}},
+                "inactive": {"$sum": {"$cond": [{"$eq": ["$is_active", False]}, 1, 0]}},
+            }
+        }
+    ]
+    result = await User.aggregate(pipeline).to_list()
+    counts = result[0] if result else {"total": 0, "active": 0, "inactive": 0}
+
     return {
-        "total_users": total_users,
-        "active_users": active_users,
-        "inactive_users": inactive_users
-    } 
\ No newline at end of file
+        "total_users": counts["total"],
+        "active_users": counts["active"],
+        "inactive_users": counts["inactive"]
+    }
\ No newline at end of file
@@ -0,0 +1,191 @@
+import asyncio
+import json
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+from redis.exceptions import RedisError
+from app.config import settings
+from app.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+# Stores a loaded value only if the key was not invalidated since the miss,
+# so a slow load can't put back the value an update just replaced
+_SET_IF_GENERATION = """
+local generation = redis.call('GET', KEYS[2]) or ''
+if generation == ARGV[1] then
+    redis.call('SET', KEYS[1], ARGV[2], 'EX', ARGV[3])
+    return 1
+end
+return 0
+"""
+
+# Invalidation counters only need to outlive loads in progress
+_GENERATION_TTL = 3600
+
+
+class TTLCache:
+    """Small in-process cache whose entries expire a fixed number of seconds after being set"""
+
+    def __init__(self, ttl: float, maxsize: int = 1024):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Get a cached value, or None if it is missing or expired"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            self._entries.pop(key, None)
+            return None
+
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        """Cache a value, evicting the oldest entry when full"""
+        self._entries.pop(key, None)
+        self._entries[key] = (time.monotonic() + (self.ttl if ttl is None else ttl), value)
+
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, key: Optional[Hashable] = None):
+        """Drop one entry, or every entry when no key is given"""
+        if key is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(key, None)
+
+
+class ReadThroughCache:
+    """Read-through cache for JSON-serializable values, backed by Redis with an optional in-process LRU tier"""
+
+    def __init__(self, namespace: str, ttl: float):
+        self.namespace = namespace
+        self.ttl = ttl
+        self._local: Optional[TTLCache] = None
+        if settings.cache_local_maxsize > 0:
+            self._local = TTLCache(ttl=min(settings.cache_local_ttl, ttl), maxsize=settings.cache_local_maxsize)
+        # Loads in progress in this process, so concurrent misses share one load
+        self._inflight: Dict[str, "asyncio.Future[Any]"] = {}
+
+    def key(self, key: str) -> str:
+        return f"cache:{self.namespace}:{key}"
+
+    def generation_key(self, key: str) -> str:
+        return f"cache:{self.namespace}:{key}:generation"
+
+    async def get_or_load(self, key: str, loader: Callable[[], Awaitable[Optional[Any]]]) -> Optional[Any]:
+        """Return the cached value for key, loading and caching it on a miss"""
+        if not settings.cache_enabled:
+            return await loader()
+
+        if self._local is not None:
+            value = self._local.get(key)
+            if value is not None:
+                return value
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            return await asyncio.shield(inflight)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            value = await self._load(key, loader)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Retrieve the exception so waiter-less futures don't warn
+            future.exception()
+            raise
+        else:
+            future.set_result(value)
+            return value
+        finally:
+            self._inflight.pop(key, None)
+
+    async def _load(self, key: str, loader: Callable[[], Awaitable[Optional[Any]]]) -> Optional[Any]:
+        try:
+            raw, generation = await get_redis().mget(self.key(key), self.generation_key(key))
+        except RedisError as e:
+            logger.warning(f"Cache read failed for {self.key(key)}: {str(e)}")
+            raw, generation = None, None
+
+        if raw is not None:
+            value = json.loads(raw)
+        else:
+            value = await loader()
+            # Missing documents are not cached
+            if value is None:
+                return None
+            try:
+                stored = await get_redis().register_script(_SET_IF_GENERATION)(
+                    keys=[self.key(key), self.generation_key(key)],
+                    args=[generation.decode() if generation else "", json.dumps(value), max(1, int(self.ttl))],
+                )
+            except RedisError as e:
+                logger.warning(f"Cache write failed for {self.key(key)}: {str(e)}")
+                stored = None
+            if stored == 0:
+                # Invalidated while loading; serve this value once without caching it
+                return value
+
+        if self._local is not None:
+            self._local.set(key, value)
+        return value
+
+    async def invalidate(self, *keys: str):
+        """Drop keys from both cache tiers"""
+        if not keys:
+            return
+
+        if self._local is not None:
+            for key in keys:
+                self._local.invalidate(key)
+
+        try:
+            async with get_redis().pipeline(transaction=False) as pipe:
+                pipe.delete(*(self.key(key) for key in keys))
+                # Loads that started before this won't store their value
+                for key in keys:
+                    pipe.incr(self.generation_key(key))
+                    pipe.expire(self.generation_key(key), _GENERATION_TTL)
+                await pipe.execute()
+        except RedisError as e:
+            logger.warning(f"Cache invalidation failed for {self.namespace} {keys}: {str(e)}")
+
+
+# Caches for the heavily polled lookup endpoints
+task_cache = ReadThroughCache("task", ttl=settings.cache_ttl)
+task_status_cache = ReadThroughCache("task_status", ttl=settings.cache_status_ttl)
+user_cache = ReadThroughCache("user", ttl=settings.cache_ttl)
+
+
+async def invalidate_tasks(*task_ids: str):
+    """Drop cached task documents and Celery statuses after a task changes"""
+    await task_cache.invalidate(*task_ids)
+    await task_status_cache.invalidate(*task_ids)
+
+
+# Short-lived cache for the polled statistics endpoints
+_stats_cache = TTLCache(ttl=settings.stats_cache_ttl)
+
+
+async def cached_stats(name: str, estimated: bool, compute: Callable[[bool], Awaitable[dict]]) -> dict:
+    """Statistics for a /stats/summary endpoint, cached briefly, or longer when estimated"""
+    key = (name, "estimated" if estimated else "exact")
+    stats = _stats_cache.get(key)
+    if stats is None:
+        stats = await compute(estimated)
+        ttl = settings.stats_estimated_cache_ttl if estimated else settings.stats_cache_ttl
+        _stats_cache.set(key, stats, ttl=ttl)
+
+    return stats
\ No newline at end of file
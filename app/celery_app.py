@@ -1,14 +1,108 @@
+from typing import Any, Dict, Iterable, List, Optional
 from celery import Celery
+from kombu import Queue
 from app.config import settings
 
-# Create Celery instance
+# Create Celery instance. Task state and results are kept in Mongo, so the
+# result backend can be turned off with CELERY_IGNORE_RESULTS
 celery_app = Celery(
     "fastapi_celery_demo",
     broker=settings.celery_broker_url,
-    backend=settings.celery_result_backend,
+    backend=None if settings.celery_ignore_results else settings.celery_result_backend,
     include=["app.tasks"]
 )
 
+# Queue profiles: each process_task operation, and maintenance work, gets
+# its own queues and its own worker pool settings. Profiles with
+# "priorities" get one queue per task priority, e.g. email.high.
+# Time limits are applied per message; concurrency, prefetch and
+# max_tasks_per_child are applied by `python celery_worker.py --profile`.
+QUEUE_PROFILES: Dict[str, Dict[str, Any]] = {
+    "default": {
+        "queue": "tasks",
+        "priorities": True,
+        "concurrency": 4,
+        "prefetch_multiplier": 1,
+        "time_limit": 30 * 60,
+        "soft_time_limit": 25 * 60,
+        "max_tasks_per_child": 1000,
+    },
+    "data_processing": {
+        "queue": "data",
+        "priorities": True,
+        "concurrency": 4,
+        "prefetch_multiplier": 1,
+        "time_limit": 30 * 60,
+        "soft_time_limit": 25 * 60,
+        "max_tasks_per_child": 500,
+    },
+    "file_processing": {
+        "queue": "files",
+        "priorities": True,
+        "concurrency": 2,
+        "prefetch_multiplier": 1,
+        "time_limit": 60 * 60,
+        "soft_time_limit": 55 * 60,
+        "max_tasks_per_child": 100,
+    },
+    "email_sending": {
+        "queue": "email",
+        "priorities": True,
+        "concurrency": 16,
+        "prefetch_multiplier": 4,
+        "time_limit": 5 * 60,
+        "soft_time_limit": 4 * 60,
+        "max_tasks_per_child": 5000,
+    },
+    "maintenance": {
+        "queue": "maintenance",
+        "priorities": False,
+        "concurrency": 1,
+        "prefetch_multiplier": 1,
+        "time_limit": 2 * 60 * 60,
+        "soft_time_limit": 115 * 60,
+        "max_tasks_per_child": 100,
+    },
+}
+
+# Tasks served by the maintenance profile
+MAINTENANCE_TASKS = [
+    "app.tasks.cleanup_old_tasks",
+    "app.tasks.reconcile_counters",
+    "app.tasks.refresh_task_rollups",
+    "app.tasks.generate_report",
+]
+
+
+def profile_queues(profile_name: str, priorities: Optional[Iterable[str]] = None) -> List[str]:
+    """Queue names of a profile, optionally limited to some task priorities"""
+    profile = QUEUE_PROFILES[profile_name]
+    if not profile["priorities"]:
+        return [profile["queue"]]
+    return [f"{profile['queue']}.{priority}" for priority in (priorities or settings.celery_message_priorities)]
+
+
+def profile_for_operation(operation: str) -> str:
+    """Name of the queue profile serving a process_task operation"""
+    return operation if operation in QUEUE_PROFILES and operation != "maintenance" else "default"
+
+
+def route_for_task(operation: str, priority: Any) -> Dict[str, Any]:
+    """apply_async options sending a process_task message to its operation and priority queue"""
+    profile_name = profile_for_operation(operation)
+    profile = QUEUE_PROFILES[profile_name]
+    priority = getattr(priority, "value", priority)
+    if priority not in settings.celery_message_priorities:
+        priority = "medium"
+
+    return {
+        "queue": profile_queues(profile_name, [priority])[0],
+        "priority": settings.celery_message_priorities[priority],
+        "time_limit": profile["time_limit"],
+        "soft_time_limit": profile["soft_time_limit"],
+    }
+
+
 # Celery configuration
 celery_app.conf.update(
     task_serializer="json",
@@ -17,9 +111,44 @@ celery_app.conf.update(
     timezone="UTC",
     enable_utc=True,
     task_track_started=True,
+    task_ignore_result=settings.celery_ignore_results,
     task_time_limit=30 * 60,  # 30 minutes
     task_soft_time_limit=25 * 60,  # 25 minutes
     worker_prefetch_multiplier=1,
     worker_max_tasks_per_child=1000,
     result_expires=3600,  # 1 hour
-) 
\ No newline at end of file
+    # Routing: every profile queue is declared, so a worker started
+    # without -Q consumes all of them
+    task_default_queue=settings.celery_default_queue,
+    task_queues=[
+        Queue(name)
+        for name in dict.fromkeys([
+            settings.celery_default_queue,
+            *(queue for profile_name in QUEUE_PROFILES for queue in profile_queues(profile_name)),
+        ])
+    ],
+    task_routes={name: {"queue": QUEUE_PROFILES["maintenance"]["queue"]} for name in MAINTENANCE_TASKS},
+    task_annotations={
+        name: {
+            "time_limit": QUEUE_PROFILES["maintenance"]["time_limit"],
+            "soft_time_limit": QUEUE_PROFILES["maintenance"]["soft_time_limit"],
+        }
+        for name in MAINTENANCE_TASKS
+    },
+    # Broker-level priorities within a queue; with Redis, 0 is served first
+    broker_transport_options={
+        "priority_steps": settings.celery_priority_steps,
+        "sep": ":",
+        "queue_order_strategy": "priority",
+    },
+    beat_schedule={
+        "reconcile-task-counters": {
+            "task": "app.tasks.reconcile_counters",
+            "schedule": settings.counters_reconcile_interval,
+        },
+        "refresh-task-rollups": {
+            "task": "app.tasks.refresh_task_rollups",
+            "schedule": settings.report_rollup_interval,
+        },
+    },
+)
\ No newline at end of file
@@ -0,0 +1,30 @@
+from datetime import datetime
+from typing import Any, Optional
+from motor.motor_asyncio import AsyncIOMotorCollection
+from app.database import get_database
+
+# Progress markers that let long-running maintenance jobs resume where they stopped
+CHECKPOINTS_COLLECTION = "maintenance_checkpoints"
+
+
+def _collection() -> AsyncIOMotorCollection:
+    return get_database()[CHECKPOINTS_COLLECTION]
+
+
+async def get_checkpoint(name: str) -> Optional[dict]:
+    """Get the saved checkpoint for a job, if any"""
+    return await _collection().find_one({"_id": name})
+
+
+async def save_checkpoint(name: str, **values: Any):
+    """Save checkpoint values for a job"""
+    await _collection().update_one(
+        {"_id": name},
+        {"$set": {**values, "updated_at": datetime.utcnow()}},
+        upsert=True,
+    )
+
+
+async def clear_checkpoint(name: str):
+    """Remove a job's checkpoint once it has finished"""
+    await _collection().delete_one({"_id": name})
\ No newline at end of file
@@ -1,5 +1,5 @@
 import os
-from typing import Optional
+from typing import Dict, List, Optional
 from pydantic_settings import BaseSettings
 
 
@@ -7,13 +7,88 @@ class Settings(BaseSettings):
     # MongoDB Configuration
     mongodb_url: str = "mongodb://localhost:27017"
     database_name: str = "fastapi_celery_demo"
-    
+    mongodb_max_pool_size: int = 100
+    mongodb_min_pool_size: int = 0
+    mongodb_max_idle_time_ms: Optional[int] = 300000  # 5 minutes
+    mongodb_connect_timeout_ms: int = 10000
+    mongodb_server_selection_timeout_ms: int = 10000
+    mongodb_socket_timeout_ms: Optional[int] = None
+    mongodb_wait_queue_timeout_ms: Optional[int] = None
+
     # Redis Configuration
     redis_url: str = "redis://localhost:6379/0"
+    redis_max_connections: int = 100
+    redis_socket_timeout: float = 5.0
     
     # Celery Configuration
     celery_broker_url: str = "redis://localhost:6379/0"
     celery_result_backend: str = "redis://localhost:6379/0"
+    celery_ignore_results: bool = False  # Don't store task results; Redis is then only the broker
+    celery_status_backend_fallback: bool = True  # Ask the result backend whether a processing task has started
+    celery_default_queue: str = "celery"
+    celery_message_priorities: Dict[str, int] = {"high": 0, "medium": 3, "low": 6}  # Redis: lower runs first
+    celery_priority_steps: List[int] = [0, 3, 6, 9]
+    
+    # Admission Control Configuration (queue depth at which new work is rejected with 429)
+    admission_enabled: bool = True
+    admission_queue_limits: Dict[str, int] = {"low": 1000, "medium": 5000, "high": 20000}  # Per task priority
+    admission_maintenance_queue_limit: int = 10  # Queued cleanup and report jobs
+    admission_depth_cache_ttl: float = 2.0  # Seconds to cache broker queue lengths
+    admission_retry_after: int = 30  # Retry-After seconds sent with 429 responses
+    
+    # Worker Configuration
+    worker_max_concurrent_tasks: int = 50  # Task coroutines running at once per worker process
+    worker_blocking_threads: int = 32  # Thread pool size for blocking steps inside tasks
+    
+    # Task Log Configuration
+    task_log_batch_size: int = 100  # Flush buffered log entries at this many entries
+    task_log_flush_interval: float = 2.0  # ...or when this many seconds passed since the last flush
+    task_log_write_concern_w: str = "1"  # "0" (unacknowledged), "1", "majority", ...
+    task_log_write_concern_journal: Optional[bool] = None
+    
+    # Bulk Endpoint Configuration
+    bulk_max_items: int = 1000  # Maximum items per bulk create or batch process request
+    
+    # Idempotency Configuration
+    idempotency_key_ttl: float = 24 * 60 * 60  # Seconds a stored response is replayed for a repeated Idempotency-Key
+    idempotency_lease_seconds: float = 5 * 60  # Seconds a request in progress holds its key before a retry may take over
+    
+    # Export Configuration
+    export_batch_size: int = 1000  # Documents fetched per cursor round trip when streaming exports
+    
+    # Cleanup Configuration
+    cleanup_batch_size: int = 500  # Tasks deleted per batch
+    cleanup_batch_pause: float = 0.5  # Seconds to wait between batches
+    
+    # Retention Configuration (days, enforced by TTL indexes; missing or 0 keeps forever)
+    task_log_retention_days: Dict[str, float] = {"debug": 1, "info": 14, "warning": 30, "error": 90}
+    task_retention_days: Dict[str, float] = {"completed": 30, "failed": 90}
+    
+    # Report Configuration
+    report_rollup_interval: float = 5 * 60  # Seconds between hourly rollup refreshes
+    report_rollup_grace_hours: int = 2  # Recent hours recomputed on every refresh
+    report_peak_hours: int = 3  # Busiest hours of the day listed in reports
+    
+    # Task Event Streaming Configuration
+    task_events_enabled: bool = True  # Publish status changes and log entries over Redis pub/sub
+    task_events_heartbeat: float = 15.0  # Seconds between keepalive frames on idle streams
+    task_events_queue_size: int = 100  # Events buffered per client before the oldest is dropped
+    
+    # Statistics Configuration
+    stats_cache_ttl: float = 5.0  # Seconds to cache /stats/summary responses
+    stats_estimated_cache_ttl: float = 60.0  # Seconds to cache ?estimated=true responses
+    counters_reconcile_interval: float = 15 * 60  # Seconds between task counter reconciliations
+    
+    # Cache Configuration
+    cache_enabled: bool = True
+    cache_ttl: float = 60.0  # Seconds to cache task and user lookups in Redis
+    cache_status_ttl: float = 5.0  # Seconds to cache Celery task status lookups in Redis
+    cache_local_maxsize: int = 0  # Entries in the in-process LRU tier, 0 disables it
+    cache_local_ttl: float = 1.0  # Seconds an entry stays in the in-process tier
+    
+    # Metrics Configuration
+    metrics_enabled: bool = True  # Prometheus metrics on /metrics and the worker exporter
+    metrics_worker_port: int = 9808  # Worker exporter port, 0 disables it; use one per worker on a host
     
     # Application Configuration
     app_host: str = "0.0.0.0"
@@ -0,0 +1,133 @@
+from datetime import datetime
+from typing import Dict, Optional
+from motor.motor_asyncio import AsyncIOMotorCollection
+from app.database import get_database
+from app.models import Task, TaskStatus, TaskPriority
+
+# Single document holding task counts by status and priority, kept up to
+# date with $inc on every transition and periodically reconciled
+COUNTERS_COLLECTION = "task_counters"
+TASK_COUNTERS_ID = "tasks"
+
+
+def _collection() -> AsyncIOMotorCollection:
+    return get_database()[COUNTERS_COLLECTION]
+
+
+def _value(enum_or_str) -> str:
+    return getattr(enum_or_str, "value", enum_or_str)
+
+
+async def increment_task_counters(
+    status_deltas: Optional[Dict[str, int]] = None,
+    priority_deltas: Optional[Dict[str, int]] = None,
+):
+    """Atomically apply count deltas to the task counters document"""
+    inc: Dict[str, int] = {}
+    for status, delta in (status_deltas or {}).items():
+        key = f"by_status.{_value(status)}"
+        inc[key] = inc.get(key, 0) + delta
+    for priority, delta in (priority_deltas or {}).items():
+        key = f"by_priority.{_value(priority)}"
+        inc[key] = inc.get(key, 0) + delta
+
+    inc = {key: delta for key, delta in inc.items() if delta}
+    if not inc:
+        return
+
+    # No upsert: until reconcile_task_counters has created the document
+    # from the tasks collection, deltas would only produce partial counts
+    await _collection().update_one(
+        {"_id": TASK_COUNTERS_ID},
+        {"$inc": inc, "$set": {"updated_at": datetime.utcnow()}},
+    )
+
+
+async def record_task_created(priority: TaskPriority, count: int = 1):
+    """Count newly created pending tasks"""
+    await increment_task_counters({TaskStatus.PENDING: count}, {priority: count})
+
+
+async def record_status_change(old_status: TaskStatus, new_status: TaskStatus, count: int = 1):
+    """Move tasks from one status counter to another"""
+    if _value(old_status) == _value(new_status):
+        return
+    await increment_task_counters({old_status: -count, new_status: count})
+
+
+async def record_priority_change(old_priority: TaskPriority, new_priority: TaskPriority):
+    """Move a task from one priority counter to another"""
+    if _value(old_priority) == _value(new_priority):
+        return
+    await increment_task_counters(priority_deltas={old_priority: -1, new_priority: 1})
+
+
+async def record_task_deleted(status: TaskStatus, priority: TaskPriority, count: int = 1):
+    """Remove deleted tasks from the counters"""
+    await increment_task_counters({status: -count}, {priority: -count})
+
+
+async def get_task_counters() -> Optional[dict]:
+    """Read task counts by status and priority in one document lookup"""
+    doc = await _collection().find_one({"_id": TASK_COUNTERS_ID})
+    if doc is None:
+        return None
+
+    return {
+        "by_status": {status.value: doc.get("by_status", {}).get(status.value, 0) for status in TaskStatus},
+        "by_priority": {priority.value: doc.get("by_priority", {}).get(priority.value, 0) for priority in TaskPriority},
+    }
+
+
+async def count_tasks_from_source() -> dict:
+    """Count tasks by status and priority from the tasks collection in a single aggregation"""
+    pipeline = [
+        {
+            "$facet": {
+                "by_status": [{"$group": {"_id": "$status", "count": {"$sum": 1}}}],
+                "by_priority": [{"$group": {"_id": "$priority", "count": {"$sum": 1}}}],
+            }
+        }
+    ]
+    result = await Task.aggregate(pipeline).to_list()
+    facets = result[0] if result else {"by_status": [], "by_priority": []}
+
+    by_status = {status.value: 0 for status in TaskStatus}
+    for row in facets["by_status"]:
+        if row["_id"] in by_status:
+            by_status[row["_id"]] = row["count"]
+
+    by_priority = {priority.value: 0 for priority in TaskPriority}
+    for row in facets["by_priority"]:
+        if row["_id"] in by_priority:
+            by_priority[row["_id"]] = row["count"]
+
+    return {"by_status": by_status, "by_priority": by_priority}
+
+
+async def reconcile_task_counters() -> dict:
+    """Recompute the counters from the tasks collection and overwrite the stored values"""
+    counts = await count_tasks_from_source()
+
+    # Increments landing between the aggregation and this write can be
+    # lost; the next reconciliation corrects them
+    await _collection().update_one(
+        {"_id": TASK_COUNTERS_ID},
+        {
+            "$set": {
+                "by_status": counts["by_status"],
+                "by_priority": counts["by_priority"],
+                "updated_at": datetime.utcnow(),
+                "reconciled_at": datetime.utcnow(),
+            }
+        },
+        upsert=True,
+    )
+
+    return counts
+
+
+async def ensure_task_counters():
+    """Build the counters document from the tasks collection if it doesn't exist yet"""
+    if await _collection().find_one({"_id": TASK_COUNTERS_ID}, projection={"_id": 1}) is None:
+        await reconcile_task_counters()
\ No newline at end of file
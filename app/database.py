@@ -1,22 +1,64 @@
-from motor.motor_asyncio import AsyncIOMotorClient
+from typing import Optional
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
 from beanie import init_beanie
 from app.config import settings
-from app.models import Task, User, TaskLog
+from app.metrics import MongoCommandMetrics
+from app.models import Task, User, TaskLog, IdempotencyRecord
+
+# Process-wide Motor client, created once by init_db()
+_client: Optional[AsyncIOMotorClient] = None
+
+
+def create_client() -> AsyncIOMotorClient:
+    """Create a Motor client using the configured pool settings"""
+    return AsyncIOMotorClient(
+        settings.mongodb_url,
+        maxPoolSize=settings.mongodb_max_pool_size,
+        minPoolSize=settings.mongodb_min_pool_size,
+        maxIdleTimeMS=settings.mongodb_max_idle_time_ms,
+        connectTimeoutMS=settings.mongodb_connect_timeout_ms,
+        serverSelectionTimeoutMS=settings.mongodb_server_selection_timeout_ms,
+        socketTimeoutMS=settings.mongodb_socket_timeout_ms,
+        waitQueueTimeoutMS=settings.mongodb_wait_queue_timeout_ms,
+        event_listeners=[MongoCommandMetrics()] if settings.metrics_enabled else [],
+    )
 
 
 async def init_db():
-    """Initialize database connection and Beanie models"""
-    # Create motor client
-    client = AsyncIOMotorClient(settings.mongodb_url)
-    
-    # Initialize Beanie with the Product document class
+    """Initialize the shared database connection and Beanie models"""
+    global _client
+
+    # Only initialize once per process
+    if _client is not None:
+        return
+
+    client = create_client()
+
+    # Initialize Beanie with the application document classes
     await init_beanie(
         database=client[settings.database_name],
-        document_models=[Task, User, TaskLog]
+        document_models=[Task, User, TaskLog, IdempotencyRecord]
     )
 
+    _client = client
+
+
+def get_client() -> AsyncIOMotorClient:
+    """Get the shared Motor client"""
+    if _client is None:
+        raise RuntimeError("Database is not initialized, call init_db() first")
+    return _client
+
+
+def get_database() -> AsyncIOMotorDatabase:
+    """Get the application database from the shared client"""
+    return get_client()[settings.database_name]
+
 
 async def close_db():
     """Close database connection"""
-    # Motor client will be closed automatically when the application shuts down
-    pass 
\ No newline at end of file
+    global _client
+
+    if _client is not None:
+        _client.close()
+        _client = None
\ No newline at end of file
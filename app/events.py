@@ -0,0 +1,136 @@
+import asyncio
+import json
+import logging
+from collections import defaultdict
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Iterable, Optional, Set, Tuple
+from redis.asyncio.client import PubSub
+from redis.exceptions import RedisError
+from app.config import settings
+from app.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+# Workers and the API publish task events on one Redis channel per task
+TASK_EVENTS_PREFIX = "task_events:"
+
+
+def task_events_channel(task_id: str) -> str:
+    return f"{TASK_EVENTS_PREFIX}{task_id}"
+
+
+def _encode_event(event: str, data: Dict[str, Any]) -> str:
+    return json.dumps({"event": event, "data": data}, default=str)
+
+
+async def publish_task_event(task_id: str, event: str, data: Dict[str, Any]):
+    """Publish a task event for connected stream clients"""
+    await publish_task_events([(task_id, event, data)])
+
+
+async def publish_task_events(events: Iterable[Tuple[str, str, Dict[str, Any]]]):
+    """Publish several task events in one round trip"""
+    if not settings.task_events_enabled:
+        return
+
+    try:
+        async with get_redis().pipeline(transaction=False) as pipe:
+            for task_id, event, data in events:
+                pipe.publish(task_events_channel(task_id), _encode_event(event, data))
+            await pipe.execute()
+    except RedisError as e:
+        # Streaming is best effort; never fail the task because of it
+        logger.warning(f"Failed to publish task events: {str(e)}")
+
+
+class TaskEventHub:
+    """Fans out task events from one Redis pub/sub connection to every connected client in this process"""
+
+    def __init__(self):
+        self._subscribers: Dict[str, Set["asyncio.Queue[Dict[str, Any]]"]] = defaultdict(set)
+        self._pubsub: Optional[PubSub] = None
+        self._reader: Optional["asyncio.Task[None]"] = None
+
+    async def start(self):
+        """Start reading from Redis"""
+        if self._reader is None or self._reader.done():
+            self._reader = asyncio.create_task(self._read_forever())
+
+    async def stop(self):
+        """Stop reading from Redis and close the subscription"""
+        if self._reader is not None:
+            self._reader.cancel()
+            try:
+                await self._reader
+            except asyncio.CancelledError:
+                pass
+            self._reader = None
+
+    @asynccontextmanager
+    async def subscribe(self, task_id: str) -> AsyncIterator["asyncio.Queue[Dict[str, Any]]"]:
+        """Receive events for one task on a bounded queue while the context is open"""
+        await self.start()
+
+        queue: "asyncio.Queue[Dict[str, Any]]" = asyncio.Queue(maxsize=settings.task_events_queue_size)
+        first = not self._subscribers[task_id]
+        self._subscribers[task_id].add(queue)
+        try:
+            # Only the first local client for a task subscribes in Redis
+            if first and self._pubsub is not None:
+                await self._pubsub.subscribe(task_events_channel(task_id))
+            yield queue
+        finally:
+            self._subscribers[task_id].discard(queue)
+            if not self._subscribers[task_id]:
+                del self._subscribers[task_id]
+                if self._pubsub is not None:
+                    try:
+                        await self._pubsub.unsubscribe(task_events_channel(task_id))
+                    except RedisError as e:
+                        logger.warning(f"Failed to unsubscribe from task {task_id} events: {str(e)}")
+
+    async def _read_forever(self):
+        while True:
+            try:
+                self._pubsub = get_redis().pubsub(ignore_subscribe_messages=True)
+                # Resubscribe clients that connected before a reconnect
+                if self._subscribers:
+                    await self._pubsub.subscribe(*(task_events_channel(task_id) for task_id in self._subscribers))
+
+                while True:
+                    if not self._pubsub.subscribed:
+                        await asyncio.sleep(0.1)
+                        continue
+                    message = await self._pubsub.get_message(timeout=1.0)
+                    if message is not None and message["type"] == "message":
+                        self._dispatch(message["channel"], message["data"])
+
+            except asyncio.CancelledError:
+                raise
+            except (RedisError, OSError) as e:
+                logger.warning(f"Task event subscription failed, reconnecting: {str(e)}")
+                await asyncio.sleep(1)
+            finally:
+                if self._pubsub is not None:
+                    await self._pubsub.close()
+                    self._pubsub = None
+
+    def _dispatch(self, channel: Any, raw: Any):
+        if isinstance(channel, bytes):
+            channel = channel.decode()
+        task_id = channel[len(TASK_EVENTS_PREFIX):]
+
+        queues = self._subscribers.get(task_id)
+        if not queues:
+            return
+
+        payload = json.loads(raw)
+        for queue in queues:
+            # Slow clients lose their oldest events rather than stalling others
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(payload)
+
+
+# Hub shared by every streaming request in the API process
+task_event_hub = TaskEventHub()
\ No newline at end of file
@@ -0,0 +1,101 @@
+import csv
+import io
+import json
+from datetime import datetime
+from enum import Enum
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Tuple
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorCollection
+from app.config import settings
+
+
+class ExportFormat(str, Enum):
+    NDJSON = "ndjson"
+    CSV = "csv"
+
+
+EXPORT_MEDIA_TYPES = {
+    ExportFormat.NDJSON: "application/x-ndjson",
+    ExportFormat.CSV: "text/csv",
+}
+
+TASK_EXPORT_FIELDS = [
+    "id",
+    "title",
+    "description",
+    "status",
+    "priority",
+    "celery_task_id",
+    "result",
+    "error_message",
+    "created_at",
+    "updated_at",
+    "completed_at",
+]
+
+TASK_LOG_EXPORT_FIELDS = ["id", "task_id", "level", "message", "timestamp"]
+
+
+def _export_value(value: Any) -> Any:
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def _export_row(doc: Dict[str, Any], fields: Sequence[str]) -> Dict[str, Any]:
+    return {field: _export_value(doc.get("_id" if field == "id" else field)) for field in fields}
+
+
+def time_range_filter(field: str, start: Optional[datetime], end: Optional[datetime]) -> Dict[str, Any]:
+    """Query condition selecting documents with field in [start, end)"""
+    bounds = {}
+    if start is not None:
+        bounds["$gte"] = start
+    if end is not None:
+        bounds["$lt"] = end
+    return {field: bounds} if bounds else {}
+
+
+async def export_documents(
+    collection: AsyncIOMotorCollection,
+    query: Dict[str, Any],
+    sort: List[Tuple[str, int]],
+    fields: Sequence[str],
+    export_format: ExportFormat,
+    batch_size: Optional[int] = None,
+) -> AsyncIterator[str]:
+    """
+    Stream matching documents as NDJSON lines or CSV rows.
+
+    The cursor fetches batch_size documents per round trip and one chunk is
+    yielded per batch, so memory stays constant however many documents match.
+    """
+    batch_size = batch_size or settings.export_batch_size
+    projection = {field: 1 for field in fields if field != "id"}
+    cursor = collection.find(query, projection=projection).sort(sort).batch_size(batch_size)
+
+    buffer = io.StringIO()
+    writer = None
+    if export_format == ExportFormat.CSV:
+        writer = csv.DictWriter(buffer, fieldnames=list(fields))
+        writer.writeheader()
+
+    rows = 0
+    async for doc in cursor:
+        row = _export_row(doc, fields)
+        if writer is not None:
+            writer.writerow(row)
+        else:
+            buffer.write(json.dumps(row, default=str))
+            buffer.write("\n")
+
+        rows += 1
+        if rows % batch_size == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+
+    if buffer.tell():
+        yield buffer.getvalue()
\ No newline at end of file
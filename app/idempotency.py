@@ -0,0 +1,95 @@
+import hashlib
+import json
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, Optional
+from fastapi import HTTPException
+from fastapi.responses import ORJSONResponse
+from pymongo.errors import DuplicateKeyError
+from app.config import settings
+from app.models import IdempotencyRecord
+
+
+def _request_hash(request: Any) -> str:
+    return hashlib.sha256(json.dumps(request, sort_keys=True, default=str).encode()).hexdigest()
+
+
+async def _reserve(key: str, request_hash: str) -> Optional[Dict[str, Any]]:
+    """
+    Reserve an idempotency key for a new request.
+
+    Returns None if the key is new, or the stored response if a request with
+    this key already completed. A reservation is only a short lease until the
+    response is stored, so a request whose process died can be retried.
+    """
+    now = datetime.utcnow()
+    lease_expires_at = now + timedelta(seconds=settings.idempotency_lease_seconds)
+    record = IdempotencyRecord(
+        key=key,
+        request_hash=request_hash,
+        created_at=now,
+        expires_at=lease_expires_at,
+    )
+    try:
+        await record.insert()
+        return None
+    except DuplicateKeyError:
+        pass
+
+    existing = await IdempotencyRecord.find_one(IdempotencyRecord.key == key)
+    if existing is None:
+        # Expired between the insert and the lookup
+        raise HTTPException(status_code=409, detail="Idempotency-Key was just released, retry the request")
+
+    if existing.response is None and existing.expires_at <= now:
+        # The request holding the lease never finished; take it over unless
+        # another retry got there first
+        reclaimed = await IdempotencyRecord.get_motor_collection().update_one(
+            {"key": key, "response": None, "expires_at": existing.expires_at},
+            {"$set": {"request_hash": request_hash, "created_at": now, "expires_at": lease_expires_at}},
+        )
+        if reclaimed.modified_count:
+            return None
+        raise HTTPException(status_code=409, detail="A request with this Idempotency-Key is still in progress")
+
+    if existing.request_hash != request_hash:
+        raise HTTPException(status_code=422, detail="Idempotency-Key was already used with a different request")
+    if existing.response is None:
+        raise HTTPException(status_code=409, detail="A request with this Idempotency-Key is still in progress")
+    return existing.response
+
+
+async def run_idempotent(
+    idempotency_key: Optional[str],
+    scope: str,
+    request: Any,
+    handler: Callable[[], Awaitable[Dict[str, Any]]],
+) -> Any:
+    """
+    Run handler once per idempotency key and scope.
+
+    A repeated request with the same key gets the stored response without
+    running handler again. If handler fails, the key is released so the
+    client can retry.
+    """
+    if not idempotency_key:
+        return await handler()
+
+    key = f"{scope}:{idempotency_key}"
+    stored = await _reserve(key, _request_hash(request))
+    if stored is not None:
+        return ORJSONResponse(stored, headers={"Idempotent-Replayed": "true"})
+
+    try:
+        response = await handler()
+    except BaseException:
+        await IdempotencyRecord.find_one(IdempotencyRecord.key == key).delete()
+        raise
+
+    # Keep the response for replays from now on, not just for the lease
+    await IdempotencyRecord.find_one(IdempotencyRecord.key == key).update({
+        "$set": {
+            "response": response,
+            "expires_at": datetime.utcnow() + timedelta(seconds=settings.idempotency_key_ttl),
+        }
+    })
+    return response
\ No newline at end of file
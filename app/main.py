@@ -1,17 +1,32 @@
+import logging
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse, Response
 from contextlib import asynccontextmanager
+from redis.exceptions import RedisError
 from app.config import settings
+from app.admission import broker_queue_depths
+from app.celery_app import celery_app
+from app.metrics import QUEUE_DEPTH, MetricsMiddleware, render_metrics
 from app.database import init_db, close_db
+from app.counters import ensure_task_counters
+from app.redis_client import close_redis
+from app.events import task_event_hub
 from app.api import tasks, users
 
+logger = logging.getLogger(__name__)
+
 # Lifespan context manager for startup/shutdown events
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
     await init_db()
+    await ensure_task_counters()
+    await task_event_hub.start()
     yield
     # Shutdown
+    await task_event_hub.stop()
+    await close_redis()
     await close_db()
 
 
@@ -20,7 +35,8 @@ app = FastAPI(
     title="FastAPI Celery MongoDB Demo",
     description="A FastAPI application with Celery background workers and MongoDB using Beanie",
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
 # Add CORS middleware
@@ -32,6 +48,10 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Record per-route latency
+if settings.metrics_enabled:
+    app.add_middleware(MetricsMiddleware)
+
 # Include routers
 app.include_router(tasks.router)
 app.include_router(users.router)
@@ -57,6 +77,20 @@ async def health_check():
     }
 
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus metrics"""
+    try:
+        depths = await broker_queue_depths(queue.name for queue in celery_app.conf.task_queues)
+        for queue, depth in depths.items():
+            QUEUE_DEPTH.labels(queue).set(depth)
+    except RedisError as e:
+        logger.warning(f"Failed to read queue depths: {str(e)}")
+    
+    data, content_type = render_metrics()
+    return Response(data, media_type=content_type)
+
+
 @app.get("/info")
 async def api_info():
     """API information and available endpoints"""
@@ -77,6 +111,7 @@ async def api_info():
             "tasks": "/tasks",
             "users": "/users",
             "docs": "/docs",
-            "health": "/health"
+            "health": "/health",
+            "metrics": "/metrics"
         }
     } 
\ No newline at end of file
@@ -0,0 +1,157 @@
+import logging
+import os
+import time
+from typing import Any, Callable, Tuple
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+    start_http_server,
+)
+from pymongo import monitoring
+
+logger = logging.getLogger(__name__)
+
+# Set when several processes (prefork workers, multiple uvicorn workers)
+# share one exporter; each process then writes its samples to this directory
+MULTIPROC_DIR_ENV = "PROMETHEUS_MULTIPROC_DIR"
+
+TASK_DURATION_BUCKETS = (0.5, 1, 2.5, 5, 10, 15, 30, 60, 120, 300, 600, 1800)
+
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "Time until the response starts, per route",
+    ["method", "route", "status"],
+)
+MONGO_COMMANDS = Counter(
+    "mongodb_commands_total",
+    "MongoDB commands by command name and outcome",
+    ["command", "outcome"],
+)
+MONGO_COMMAND_DURATION = Histogram(
+    "mongodb_command_duration_seconds",
+    "MongoDB command duration",
+    ["command"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5),
+)
+PROCESS_TASK_DURATION = Histogram(
+    "process_task_duration_seconds",
+    "process_task duration by operation and outcome (completed, failed or skipped)",
+    ["operation", "outcome"],
+    buckets=TASK_DURATION_BUCKETS,
+)
+CELERY_TASK_DURATION = Histogram(
+    "celery_task_duration_seconds",
+    "Celery task duration by task name and final state",
+    ["task", "state"],
+    buckets=TASK_DURATION_BUCKETS,
+)
+TASK_LOG_WRITES = Counter(
+    "task_log_writes_total",
+    "Batched inserts into task_logs",
+)
+TASK_LOG_ENTRIES = Counter(
+    "task_log_entries_total",
+    "Task log entries written, by level",
+    ["level"],
+)
+QUEUE_DEPTH = Gauge(
+    "celery_queue_depth",
+    "Messages waiting in each broker queue",
+    ["queue"],
+    multiprocess_mode="max",
+)
+
+
+class MongoCommandMetrics(monitoring.CommandListener):
+    """Counts and times every command sent by a Motor client"""
+
+    def started(self, event: monitoring.CommandStartedEvent):
+        pass
+
+    def succeeded(self, event: monitoring.CommandSucceededEvent):
+        MONGO_COMMANDS.labels(event.command_name, "succeeded").inc()
+        MONGO_COMMAND_DURATION.labels(event.command_name).observe(event.duration_micros / 1e6)
+
+    def failed(self, event: monitoring.CommandFailedEvent):
+        MONGO_COMMANDS.labels(event.command_name, "failed").inc()
+        MONGO_COMMAND_DURATION.labels(event.command_name).observe(event.duration_micros / 1e6)
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording how long each route takes to start its response"""
+
+    def __init__(self, app: Callable):
+        self.app = app
+
+    async def __call__(self, scope: dict, receive: Callable, send: Callable):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        started = False
+
+        def observe(status: Any):
+            # The route template, not the raw path, keeps label cardinality bounded
+            route = getattr(scope.get("route"), "path", "unmatched")
+            HTTP_REQUEST_DURATION.labels(scope["method"], route, str(status)).observe(time.perf_counter() - start)
+
+        async def send_with_metrics(message: dict):
+            nonlocal started
+            if message["type"] == "http.response.start":
+                started = True
+                observe(message["status"])
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_metrics)
+        except Exception:
+            if not started:
+                observe(500)
+            raise
+
+
+def _registry() -> CollectorRegistry:
+    if os.environ.get(MULTIPROC_DIR_ENV):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return registry
+    return REGISTRY
+
+
+def render_metrics() -> Tuple[bytes, str]:
+    """Metrics of this process, or of all processes in multiprocess mode, in the Prometheus text format"""
+    return generate_latest(_registry()), CONTENT_TYPE_LATEST
+
+
+def start_worker_exporter(port: int, multiprocess_pool: bool = False):
+    """
+    Serve worker metrics over HTTP from a background thread.
+
+    Prefork pools record task metrics in child processes, which this
+    process can only export through PROMETHEUS_MULTIPROC_DIR.
+    """
+    if multiprocess_pool and not os.environ.get(MULTIPROC_DIR_ENV):
+        logger.error(
+            f"Not starting the worker metrics exporter: the prefork pool needs {MULTIPROC_DIR_ENV} "
+            "set to an empty, writable directory, or run the worker with --pool=threads or --pool=solo"
+        )
+        return
+
+    try:
+        start_http_server(port, registry=_registry())
+        logger.info(f"Serving worker metrics on port {port}")
+    except OSError as e:
+        logger.warning(f"Failed to start worker metrics exporter on port {port}: {str(e)}")
+
+
+def mark_process_dead(pid: int):
+    """Drop a finished process's live gauges in multiprocess mode"""
+    if os.environ.get(MULTIPROC_DIR_ENV):
+        multiprocess.mark_process_dead(pid)
\ No newline at end of file
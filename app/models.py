@@ -1,6 +1,7 @@
 from datetime import datetime
 from typing import Optional, List
 from beanie import Document, Indexed
+from pymongo import ASCENDING, DESCENDING, IndexModel
 from pydantic import Field
 from enum import Enum
 
@@ -30,14 +31,23 @@ class Task(Document):
     created_at: datetime = Field(default_factory=datetime.utcnow, description="Creation timestamp")
     updated_at: datetime = Field(default_factory=datetime.utcnow, description="Last update timestamp")
     completed_at: Optional[datetime] = Field(None, description="Completion timestamp")
+    expires_at: Optional[datetime] = Field(None, description="When the task is removed by the TTL index")
     
     class Settings:
         name = "tasks"
         indexes = [
-            "status",
-            "priority",
-            "created_at",
             ("status", "priority"),
+            # Keyset pagination, newest first, with and without filters
+            IndexModel([("created_at", DESCENDING), ("_id", DESCENDING)]),
+            IndexModel([("status", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)]),
+            IndexModel([("priority", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)]),
+            # Batched cleanup streams completed tasks in _id order
+            IndexModel([("status", ASCENDING), ("_id", ASCENDING), ("completed_at", ASCENDING)]),
+            # Report rollups select finished tasks by completion or failure time
+            IndexModel([("completed_at", ASCENDING)], partialFilterExpression={"status": "completed"}),
+            IndexModel([("updated_at", ASCENDING)], partialFilterExpression={"status": "failed"}),
+            # Retention: finished tasks are removed once expires_at has passed
+            IndexModel([("expires_at", ASCENDING)], expireAfterSeconds=0),
         ]
 
 
@@ -52,10 +62,12 @@ class User(Document):
     
     class Settings:
         name = "users"
+        # username and email get their unique indexes from Indexed(); plain
+        # entries here would replace them with non-unique ones
         indexes = [
-            "username",
-            "email",
-            "is_active",
+            # Keyset pagination, newest first, with and without the active filter
+            IndexModel([("created_at", DESCENDING), ("_id", DESCENDING)]),
+            IndexModel([("is_active", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)]),
         ]
 
 
@@ -65,11 +77,30 @@ class TaskLog(Document):
     message: str = Field(..., description="Log message")
     level: str = Field(default="info", description="Log level")
     timestamp: datetime = Field(default_factory=datetime.utcnow, description="Log timestamp")
+    expires_at: Optional[datetime] = Field(None, description="When the log is removed by the TTL index")
     
     class Settings:
         name = "task_logs"
         indexes = [
-            "task_id",
+            # A task's logs in time order, for paginated reads and exports
+            IndexModel([("task_id", ASCENDING), ("timestamp", ASCENDING), ("_id", ASCENDING)]),
             "timestamp",
             "level",
-        ] 
\ No newline at end of file
+            # Retention: logs are removed once expires_at has passed
+            IndexModel([("expires_at", ASCENDING)], expireAfterSeconds=0),
+        ] 
+
+
+class IdempotencyRecord(Document):
+    """Stored response for a request made with an Idempotency-Key header"""
+    key: Indexed(str, unique=True) = Field(..., description="Endpoint scope and client idempotency key")
+    request_hash: str = Field(..., description="Hash of the request the key was first used with")
+    response: Optional[dict] = Field(None, description="Response body, null while the request is in progress")
+    created_at: datetime = Field(default_factory=datetime.utcnow, description="Creation timestamp")
+    expires_at: datetime = Field(..., description="When the record is removed by the TTL index")
+    
+    class Settings:
+        name = "idempotency_keys"
+        indexes = [
+            IndexModel([("expires_at", ASCENDING)], expireAfterSeconds=0),
+        ]
\ No newline at end of file
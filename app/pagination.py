@@ -0,0 +1,97 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple, Type
+from bson import ObjectId
+from bson.errors import InvalidId
+from fastapi import HTTPException
+from fastapi.responses import ORJSONResponse
+from motor.motor_asyncio import AsyncIOMotorCollection
+from pydantic import BaseModel
+from pymongo import DESCENDING
+from app.serialization import field_projection, from_mongo, parse_fields, select_fields, validated_response
+
+# Listings are ordered newest first; _id breaks ties between equal timestamps
+KEYSET_SORT = [("created_at", DESCENDING), ("_id", DESCENDING)]
+KEYSET_FIELDS = ("created_at", "_id")
+
+
+def encode_cursor(created_at: datetime, doc_id: Any) -> str:
+    """Build an opaque cursor pointing just after the given document"""
+    payload = json.dumps({"c": created_at.isoformat(), "i": str(doc_id)}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, ObjectId]:
+    """Decode a cursor produced by encode_cursor"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(payload["c"]), ObjectId(payload["i"])
+    except (ValueError, KeyError, TypeError, InvalidId):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def keyset_filter(cursor: Optional[str]) -> Dict[str, Any]:
+    """Query condition selecting documents that sort after the cursor"""
+    if not cursor:
+        return {}
+
+    created_at, doc_id = decode_cursor(cursor)
+    return {
+        "$or": [
+            {"created_at": {"$lt": created_at}},
+            {"created_at": created_at, "_id": {"$lt": doc_id}},
+        ]
+    }
+
+
+def ascending_keyset_filter(cursor: Optional[str], field: str) -> Dict[str, Any]:
+    """Query condition selecting documents after the cursor in ascending (field, _id) order"""
+    if not cursor:
+        return {}
+
+    value, doc_id = decode_cursor(cursor)
+    return {
+        "$or": [
+            {field: {"$gt": value}},
+            {field: value, "_id": {"$gt": doc_id}},
+        ]
+    }
+
+
+async def keyset_page(
+    collection: AsyncIOMotorCollection,
+    query: Dict[str, Any],
+    cursor: Optional[str],
+    limit: int,
+    fields: Optional[str],
+    item_model: Type[BaseModel],
+    list_model: Type[BaseModel],
+    summary_list_model: Type[BaseModel],
+) -> ORJSONResponse:
+    """
+    One page of a newest-first listing as {items, next_cursor}.
+
+    With ?fields=, only the selected fields are read and the page is
+    validated against the summary model instead of the full one.
+    """
+    query = {**query, **keyset_filter(cursor)}
+
+    # Only read the selected fields, plus the ones the cursor needs
+    selected = parse_fields(fields, item_model)
+    projection = field_projection(selected, *KEYSET_FIELDS) if selected else None
+
+    # Read raw documents, fetching one extra to know whether another page exists
+    docs = await collection.find(query, projection).sort(KEYSET_SORT).limit(limit + 1).to_list(None)
+
+    next_cursor = None
+    if len(docs) > limit:
+        docs = docs[:limit]
+        next_cursor = encode_cursor(docs[-1]["created_at"], docs[-1]["_id"])
+
+    if selected:
+        items = [select_fields(from_mongo(doc), selected) for doc in docs]
+        return validated_response(summary_list_model, {"items": items, "next_cursor": next_cursor}, exclude_unset=True)
+
+    return validated_response(list_model, {"items": [from_mongo(doc) for doc in docs], "next_cursor": next_cursor})
\ No newline at end of file
@@ -0,0 +1,52 @@
+from typing import Optional
+import redis.asyncio as aioredis
+from app.config import settings
+
+# Process-wide async Redis clients, created on first use
+_redis: Optional[aioredis.Redis] = None
+_broker_redis: Optional[aioredis.Redis] = None
+
+
+def _create_redis(url: str) -> aioredis.Redis:
+    return aioredis.from_url(
+        url,
+        max_connections=settings.redis_max_connections,
+        socket_timeout=settings.redis_socket_timeout,
+        socket_connect_timeout=settings.redis_socket_timeout,
+    )
+
+
+def get_redis() -> aioredis.Redis:
+    """Get the shared async Redis client"""
+    global _redis
+
+    if _redis is None:
+        _redis = _create_redis(settings.redis_url)
+
+    return _redis
+
+
+def get_broker_redis() -> aioredis.Redis:
+    """Get an async Redis client for the Celery broker, e.g. to read queue lengths"""
+    global _broker_redis
+
+    if settings.celery_broker_url == settings.redis_url:
+        return get_redis()
+
+    if _broker_redis is None:
+        _broker_redis = _create_redis(settings.celery_broker_url)
+
+    return _broker_redis
+
+
+async def close_redis():
+    """Close the shared async Redis clients"""
+    global _redis, _broker_redis
+
+    if _redis is not None:
+        await _redis.close()
+        _redis = None
+
+    if _broker_redis is not None:
+        await _broker_redis.close()
+        _broker_redis = None
\ No newline at end of file
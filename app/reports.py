@@ -0,0 +1,236 @@
+import asyncio
+import math
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+from motor.motor_asyncio import AsyncIOMotorCollection
+from pymongo import ReplaceOne
+from app.checkpoints import get_checkpoint, save_checkpoint
+from app.config import settings
+from app.counters import get_task_counters
+from app.database import get_database
+from app.models import Task, TaskStatus, TaskPriority
+
+# One document per hour with pre-aggregated task metrics; reports merge
+# these instead of rescanning the tasks collection
+ROLLUPS_COLLECTION = "task_rollups"
+ROLLUPS_CHECKPOINT = "task_rollups"
+
+# Processing times are kept as a log-scale histogram so percentiles can be
+# merged across hours; each bucket is 25% wider than the previous one
+DURATION_BUCKET_BASE = 1.25
+
+HOUR_FORMAT = "%Y-%m-%dT%H"
+
+REPORT_WINDOWS = {
+    "daily": timedelta(days=1),
+    "weekly": timedelta(days=7),
+    "monthly": timedelta(days=30),
+}
+
+
+def _collection() -> AsyncIOMotorCollection:
+    return get_database()[ROLLUPS_COLLECTION]
+
+
+def _hour_start(moment: datetime) -> datetime:
+    return moment.replace(minute=0, second=0, microsecond=0)
+
+
+def _hour_key(field: str) -> dict:
+    """Aggregation expression truncating a date field to its hour"""
+    return {"$dateToString": {"format": HOUR_FORMAT, "date": f"${field}"}}
+
+
+def _empty_rollup(hour: datetime) -> Dict[str, Any]:
+    return {
+        "_id": hour,
+        "created": {priority.value: 0 for priority in TaskPriority},
+        "completed": 0,
+        "failed": 0,
+        "duration_count": 0,
+        "duration_sum_ms": 0,
+        "duration_histogram": {},
+    }
+
+
+async def _aggregate_window(start: datetime, end: datetime) -> Dict[datetime, Dict[str, Any]]:
+    """Compute hourly rollups for [start, end) from the tasks collection"""
+    collection = Task.get_motor_collection()
+
+    created_pipeline = [
+        {"$match": {"created_at": {"$gte": start, "$lt": end}}},
+        {"$group": {"_id": {"hour": _hour_key("created_at"), "priority": "$priority"}, "count": {"$sum": 1}}},
+    ]
+    completed_pipeline = [
+        {"$match": {"status": TaskStatus.COMPLETED.value, "completed_at": {"$gte": start, "$lt": end}}},
+        {
+            "$project": {
+                "hour": _hour_key("completed_at"),
+                "duration_ms": {"$max": [{"$subtract": ["$completed_at", "$created_at"]}, 1]},
+            }
+        },
+        {
+            "$group": {
+                "_id": {
+                    "hour": "$hour",
+                    "bucket": {"$floor": {"$divide": [{"$ln": "$duration_ms"}, math.log(DURATION_BUCKET_BASE)]}},
+                },
+                "count": {"$sum": 1},
+                "sum_ms": {"$sum": "$duration_ms"},
+            }
+        },
+    ]
+    failed_pipeline = [
+        {"$match": {"status": TaskStatus.FAILED.value, "updated_at": {"$gte": start, "$lt": end}}},
+        {"$group": {"_id": _hour_key("updated_at"), "count": {"$sum": 1}}},
+    ]
+
+    # Separate pipelines so each $match can use its own index
+    created, completed, failed = await asyncio.gather(
+        collection.aggregate(created_pipeline).to_list(None),
+        collection.aggregate(completed_pipeline).to_list(None),
+        collection.aggregate(failed_pipeline).to_list(None),
+    )
+
+    rollups: Dict[datetime, Dict[str, Any]] = {}
+
+    def rollup_for(hour_key: str) -> Dict[str, Any]:
+        hour = datetime.strptime(hour_key, HOUR_FORMAT)
+        if hour not in rollups:
+            rollups[hour] = _empty_rollup(hour)
+        return rollups[hour]
+
+    for row in created:
+        rollup = rollup_for(row["_id"]["hour"])
+        priority = row["_id"]["priority"]
+        rollup["created"][priority] = rollup["created"].get(priority, 0) + row["count"]
+
+    for row in completed:
+        rollup = rollup_for(row["_id"]["hour"])
+        bucket = str(int(row["_id"]["bucket"]))
+        rollup["completed"] += row["count"]
+        rollup["duration_count"] += row["count"]
+        rollup["duration_sum_ms"] += row["sum_ms"]
+        rollup["duration_histogram"][bucket] = rollup["duration_histogram"].get(bucket, 0) + row["count"]
+
+    for row in failed:
+        rollup_for(row["_id"])["failed"] += row["count"]
+
+    return rollups
+
+
+async def refresh_rollups(now: Optional[datetime] = None) -> int:
+    """
+    Bring the hourly rollups up to date.
+
+    Only hours after the last closed hour are recomputed, so a refresh
+    normally touches just the last few hours. The first refresh backfills
+    the longest report window.
+    """
+    now = now or datetime.utcnow()
+    current_hour = _hour_start(now)
+
+    checkpoint = await get_checkpoint(ROLLUPS_CHECKPOINT)
+    if checkpoint:
+        start = checkpoint["closed_until"]
+    else:
+        start = current_hour - max(REPORT_WINDOWS.values())
+    end = current_hour + timedelta(hours=1)
+
+    rollups = await _aggregate_window(start, end)
+
+    # Hours without activity are stored too, replacing any stale values
+    operations = []
+    hour = start
+    while hour < end:
+        doc = rollups.get(hour, _empty_rollup(hour))
+        doc["updated_at"] = now
+        operations.append(ReplaceOne({"_id": hour}, doc, upsert=True))
+        hour += timedelta(hours=1)
+
+    if operations:
+        await _collection().bulk_write(operations, ordered=False)
+
+    # Hours older than the grace period no longer change
+    closed_until = max(start, current_hour - timedelta(hours=settings.report_rollup_grace_hours))
+    await save_checkpoint(ROLLUPS_CHECKPOINT, closed_until=closed_until)
+
+    return len(operations)
+
+
+def _percentile(histogram: Dict[int, int], total: int, fraction: float) -> Optional[float]:
+    """Estimate a percentile in seconds from a merged duration histogram"""
+    if total == 0:
+        return None
+
+    rank = fraction * total
+    seen = 0
+    for bucket in sorted(histogram):
+        seen += histogram[bucket]
+        if seen >= rank:
+            # Geometric midpoint of the bucket
+            return round(DURATION_BUCKET_BASE ** (bucket + 0.5) / 1000, 2)
+
+    return round(DURATION_BUCKET_BASE ** (max(histogram) + 0.5) / 1000, 2)
+
+
+def _merge_rollups(rollups: List[Dict[str, Any]]) -> Dict[str, Any]:
+    created = Counter()
+    histogram: Counter = Counter()
+    by_hour_of_day: Counter = Counter()
+    completed = failed = duration_count = duration_sum_ms = 0
+
+    for rollup in rollups:
+        created.update(rollup.get("created", {}))
+        by_hour_of_day[rollup["_id"].hour] += sum(rollup.get("created", {}).values())
+        completed += rollup.get("completed", 0)
+        failed += rollup.get("failed", 0)
+        duration_count += rollup.get("duration_count", 0)
+        duration_sum_ms += rollup.get("duration_sum_ms", 0)
+        histogram.update({int(bucket): count for bucket, count in rollup.get("duration_histogram", {}).items()})
+
+    peak_hours = [
+        f"{hour:02d}:00-{(hour + 1) % 24:02d}:00"
+        for hour, count in by_hour_of_day.most_common(settings.report_peak_hours)
+        if count > 0
+    ]
+
+    return {
+        "total_tasks": sum(created.values()),
+        "completed_tasks": completed,
+        "failed_tasks": failed,
+        "by_priority": {priority.value: created.get(priority.value, 0) for priority in TaskPriority},
+        "avg_processing_time": round(duration_sum_ms / duration_count / 1000, 2) if duration_count else None,
+        "processing_time_percentiles": {
+            "p50": _percentile(histogram, duration_count, 0.50),
+            "p95": _percentile(histogram, duration_count, 0.95),
+            "p99": _percentile(histogram, duration_count, 0.99),
+        },
+        "peak_hours": peak_hours,
+    }
+
+
+async def build_report(report_type: str, now: Optional[datetime] = None) -> Dict[str, Any]:
+    """Build a daily, weekly or monthly task report from the hourly rollups"""
+    now = now or datetime.utcnow()
+    await refresh_rollups(now)
+
+    window = REPORT_WINDOWS.get(report_type, REPORT_WINDOWS["monthly"])
+    end = _hour_start(now) + timedelta(hours=1)
+    start = end - window
+
+    rollups = await _collection().find({"_id": {"$gte": start, "$lt": end}}).to_list(None)
+
+    report = {
+        "report_type": report_type,
+        "period_start": start.isoformat(),
+        "period_end": end.isoformat(),
+        **_merge_rollups(rollups),
+    }
+
+    counters = await get_task_counters()
+    if counters is not None:
+        report["current_by_status"] = counters["by_status"]
+
+    return report
\ No newline at end of file
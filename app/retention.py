@@ -0,0 +1,20 @@
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+from app.config import settings
+
+
+def _expiry(retention_days: Dict[str, float], key: str, start: datetime) -> Optional[datetime]:
+    days = retention_days.get(key)
+    if not days or days <= 0:
+        return None
+    return start + timedelta(days=days)
+
+
+def task_expiry(status: str, finished_at: datetime) -> Optional[datetime]:
+    """When a task that finished with the given status should be removed, or None to keep it"""
+    return _expiry(settings.task_retention_days, status, finished_at)
+
+
+def task_log_expiry(level: str, timestamp: datetime) -> Optional[datetime]:
+    """When a log entry with the given level should be removed, or None to keep it"""
+    return _expiry(settings.task_log_retention_days, level, timestamp)
\ No newline at end of file
@@ -1,9 +1,16 @@
 from datetime import datetime
 from typing import Optional, List
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator
 from app.models import TaskStatus, TaskPriority
 
 
+def _reject_null(value):
+    """Omitting a field leaves it unchanged; null can't clear a required field"""
+    if value is None:
+        raise ValueError("may be omitted but not null")
+    return value
+
+
 class TaskBase(BaseModel):
     title: str = Field(..., description="Task title")
     description: Optional[str] = Field(None, description="Task description")
@@ -19,6 +26,8 @@ class TaskUpdate(BaseModel):
     description: Optional[str] = Field(None, description="Task description")
     priority: Optional[TaskPriority] = Field(None, description="Task priority")
 
+    _not_null = field_validator("title", "priority")(_reject_null)
+
 
 class TaskResponse(TaskBase):
     id: str = Field(..., description="Task ID")
@@ -34,6 +43,55 @@ class TaskResponse(TaskBase):
         from_attributes = True
 
 
+class TaskListResponse(BaseModel):
+    items: List[TaskResponse] = Field(..., description="Tasks on this page")
+    next_cursor: Optional[str] = Field(None, description="Cursor for the next page, null on the last page")
+
+
+class TaskSummaryResponse(BaseModel):
+    """Task with only the fields selected by ?fields= (id is always included)"""
+    id: str = Field(..., description="Task ID")
+    title: Optional[str] = Field(None, description="Task title")
+    description: Optional[str] = Field(None, description="Task description")
+    priority: Optional[TaskPriority] = Field(None, description="Task priority")
+    status: Optional[TaskStatus] = Field(None, description="Task status")
+    celery_task_id: Optional[str] = Field(None, description="Celery task ID")
+    result: Optional[str] = Field(None, description="Task result")
+    error_message: Optional[str] = Field(None, description="Error message if failed")
+    created_at: Optional[datetime] = Field(None, description="Creation timestamp")
+    updated_at: Optional[datetime] = Field(None, description="Last update timestamp")
+    completed_at: Optional[datetime] = Field(None, description="Completion timestamp")
+
+
+class TaskSummaryListResponse(BaseModel):
+    items: List[TaskSummaryResponse] = Field(..., description="Tasks on this page")
+    next_cursor: Optional[str] = Field(None, description="Cursor for the next page, null on the last page")
+
+
+class TaskBulkCreate(BaseModel):
+    tasks: List[TaskCreate] = Field(..., min_length=1, description="Tasks to create")
+
+
+class TaskBulkCreateResponse(BaseModel):
+    items: List[TaskResponse] = Field(..., description="Created tasks, in request order")
+
+
+class TaskBatchProcessRequest(BaseModel):
+    task_ids: List[str] = Field(..., min_length=1, description="IDs of pending tasks to process")
+    operation: str = Field(default="default", description="Type of operation to perform")
+
+
+class TaskBatchItemResult(BaseModel):
+    task_id: str = Field(..., description="Task ID")
+    status: str = Field(..., description="dispatched, throttled, not_found, not_pending or invalid_id")
+    celery_task_id: Optional[str] = Field(None, description="Celery task ID if dispatched")
+
+
+class TaskBatchProcessResponse(BaseModel):
+    dispatched: int = Field(..., description="Number of tasks dispatched")
+    results: List[TaskBatchItemResult] = Field(..., description="Per-task results, in request order")
+
+
 class UserBase(BaseModel):
     username: str = Field(..., description="Unique username")
     email: str = Field(..., description="User email")
@@ -44,12 +102,30 @@ class UserCreate(UserBase):
     pass
 
 
+class UserBulkCreate(BaseModel):
+    users: List[UserCreate] = Field(..., min_length=1, description="Users to create")
+
+
+class UserBulkItemResult(BaseModel):
+    index: int = Field(..., description="Position of the user in the request")
+    status: str = Field(..., description="created, duplicate or error")
+    id: Optional[str] = Field(None, description="User ID if created")
+    detail: Optional[str] = Field(None, description="Why the user was not created")
+
+
+class UserBulkCreateResponse(BaseModel):
+    created: int = Field(..., description="Number of users created")
+    results: List[UserBulkItemResult] = Field(..., description="Per-user results, in request order")
+
+
 class UserUpdate(BaseModel):
     username: Optional[str] = Field(None, description="Unique username")
     email: Optional[str] = Field(None, description="User email")
     full_name: Optional[str] = Field(None, description="User full name")
     is_active: Optional[bool] = Field(None, description="User active status")
 
+    _not_null = field_validator("username", "email", "full_name", "is_active")(_reject_null)
+
 
 class UserResponse(UserBase):
     id: str = Field(..., description="User ID")
@@ -61,6 +137,27 @@ class UserResponse(UserBase):
         from_attributes = True
 
 
+class UserListResponse(BaseModel):
+    items: List[UserResponse] = Field(..., description="Users on this page")
+    next_cursor: Optional[str] = Field(None, description="Cursor for the next page, null on the last page")
+
+
+class UserSummaryResponse(BaseModel):
+    """User with only the fields selected by ?fields= (id is always included)"""
+    id: str = Field(..., description="User ID")
+    username: Optional[str] = Field(None, description="Unique username")
+    email: Optional[str] = Field(None, description="User email")
+    full_name: Optional[str] = Field(None, description="User full name")
+    is_active: Optional[bool] = Field(None, description="User active status")
+    created_at: Optional[datetime] = Field(None, description="Creation timestamp")
+    updated_at: Optional[datetime] = Field(None, description="Last update timestamp")
+
+
+class UserSummaryListResponse(BaseModel):
+    items: List[UserSummaryResponse] = Field(..., description="Users on this page")
+    next_cursor: Optional[str] = Field(None, description="Cursor for the next page, null on the last page")
+
+
 class TaskLogResponse(BaseModel):
     id: str = Field(..., description="Log ID")
     task_id: str = Field(..., description="Reference to task ID")
@@ -73,7 +170,8 @@ class TaskLogResponse(BaseModel):
 
 
 class TaskWithLogsResponse(TaskResponse):
-    logs: List[TaskLogResponse] = Field(default=[], description="Task logs")
+    logs: List[TaskLogResponse] = Field(default=[], description="Task logs, oldest first")
+    next_logs_cursor: Optional[str] = Field(None, description="Cursor for the next page of logs, null on the last page")
 
 
 class CeleryTaskResponse(BaseModel):
@@ -0,0 +1,45 @@
+from typing import Any, Dict, Iterable, List, Optional, Type
+from fastapi import HTTPException
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel
+
+
+def from_mongo(doc: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Turn a raw Motor document into a response dict, exposing _id as a string id"""
+    if doc is None:
+        return None
+    doc["id"] = str(doc.pop("_id"))
+    return doc
+
+
+def validated_response(model: Type[BaseModel], content: Any, exclude_unset: bool = False) -> ORJSONResponse:
+    """
+    Validate content against the response model once and encode it with orjson.
+
+    Returning a Response skips FastAPI's own response_model validation and
+    encoding, which would otherwise run a second time.
+    """
+    return ORJSONResponse(model.model_validate(content).model_dump(exclude_unset=exclude_unset))
+
+
+def parse_fields(fields: Optional[str], model: Type[BaseModel]) -> Optional[List[str]]:
+    """Parse a comma-separated ?fields= value into field names of model, always including id"""
+    if not fields:
+        return None
+
+    requested = [field.strip() for field in fields.split(",") if field.strip()]
+    unknown = sorted(set(requested) - set(model.model_fields))
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+
+    return list(dict.fromkeys(["id", *requested]))
+
+
+def field_projection(fields: Iterable[str], *extra: str) -> Dict[str, int]:
+    """Mongo projection returning only the given response fields, plus extra document fields"""
+    return {("_id" if field == "id" else field): 1 for field in [*fields, *extra]}
+
+
+def select_fields(doc: Dict[str, Any], fields: Iterable[str]) -> Dict[str, Any]:
+    """Keep only the selected fields of a response dict"""
+    return {field: doc[field] for field in fields if field in doc}
\ No newline at end of file
@@ -0,0 +1,87 @@
+import time
+from collections import Counter
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Union
+from pymongo import WriteConcern
+from motor.motor_asyncio import AsyncIOMotorCollection
+from app.config import settings
+from app.models import TaskLog
+from app.retention import task_log_expiry
+from app.events import publish_task_event
+from app.metrics import TASK_LOG_ENTRIES, TASK_LOG_WRITES
+
+
+def _log_write_concern() -> WriteConcern:
+    """Build the write concern used for task log inserts"""
+    w: Union[int, str] = settings.task_log_write_concern_w
+    if isinstance(w, str) and w.isdigit():
+        w = int(w)
+    return WriteConcern(w=w, j=settings.task_log_write_concern_journal)
+
+
+def get_log_collection() -> AsyncIOMotorCollection:
+    """Get the task_logs collection configured with the log write concern"""
+    return TaskLog.get_motor_collection().with_options(write_concern=_log_write_concern())
+
+
+class TaskLogWriter:
+    """Buffers TaskLog entries for one task and writes them with insert_many"""
+
+    def __init__(
+        self,
+        task_id: str,
+        batch_size: Optional[int] = None,
+        flush_interval: Optional[float] = None,
+    ):
+        self.task_id = task_id
+        self.batch_size = batch_size or settings.task_log_batch_size
+        self.flush_interval = settings.task_log_flush_interval if flush_interval is None else flush_interval
+        self._buffer: List[Dict[str, Any]] = []
+        self._last_flush = time.monotonic()
+
+    async def log(self, message: str, level: str = "info"):
+        """Buffer a log entry, flushing when the size or time threshold is reached"""
+        timestamp = datetime.utcnow()
+        entry = {
+            "task_id": self.task_id,
+            "message": message,
+            "level": level,
+            "timestamp": timestamp,
+        }
+        expires_at = task_log_expiry(level, timestamp)
+        if expires_at is not None:
+            entry["expires_at"] = expires_at
+        self._buffer.append(entry)
+        
+        # Stream clients see entries immediately, before they are written
+        await publish_task_event(self.task_id, "log", {
+            "message": message,
+            "level": level,
+            "timestamp": timestamp.isoformat(),
+        })
+
+        if (
+            len(self._buffer) >= self.batch_size
+            or time.monotonic() - self._last_flush >= self.flush_interval
+        ):
+            await self.flush()
+
+    async def flush(self):
+        """Write all buffered log entries in a single round trip"""
+        self._last_flush = time.monotonic()
+        if not self._buffer:
+            return
+
+        entries, self._buffer = self._buffer, []
+        await get_log_collection().insert_many(entries, ordered=False)
+        
+        TASK_LOG_WRITES.inc()
+        for level, count in Counter(entry["level"] for entry in entries).items():
+            TASK_LOG_ENTRIES.labels(level).inc(count)
+
+    async def __aenter__(self) -> "TaskLogWriter":
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        # Flush on completion and on failure so no entries are lost
+        await self.flush()
\ No newline at end of file
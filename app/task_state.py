@@ -0,0 +1,51 @@
+from datetime import datetime
+from typing import Any, Dict, Iterable, Optional
+from bson import ObjectId
+from pymongo import ReturnDocument
+from app.cache import invalidate_tasks
+from app.counters import record_status_change
+from app.events import publish_task_event
+from app.models import Task, TaskStatus
+
+
+async def transition_task(
+    task_id: str,
+    from_statuses: Iterable[TaskStatus],
+    to_status: TaskStatus,
+    condition: Optional[Dict[str, Any]] = None,
+    **fields: Any,
+) -> Optional[Dict[str, Any]]:
+    """
+    Atomically move a task to to_status if its current status is one of
+    from_statuses (and it matches condition), setting only the given fields.
+
+    Returns the task's status, priority and celery_task_id as they were
+    before the update, or None if the task doesn't exist or didn't match.
+    """
+    if not ObjectId.is_valid(task_id):
+        return None
+
+    query = {
+        "_id": ObjectId(task_id),
+        "status": {"$in": [status.value for status in from_statuses]},
+        **(condition or {}),
+    }
+    update = {"status": to_status.value, "updated_at": datetime.utcnow(), **fields}
+
+    before = await Task.get_motor_collection().find_one_and_update(
+        query,
+        {"$set": update},
+        projection={"status": 1, "priority": 1, "celery_task_id": 1},
+        return_document=ReturnDocument.BEFORE,
+    )
+    if before is None:
+        return None
+
+    await record_status_change(before["status"], to_status)
+    await invalidate_tasks(task_id)
+    await publish_task_event(task_id, "status", {
+        "status": to_status.value,
+        "previous_status": before["status"],
+        "updated_at": update["updated_at"].isoformat(),
+    })
+    return before
\ No newline at end of file
@@ -1,12 +1,24 @@
+import asyncio
 import time
 import random
 import logging
-from datetime import datetime
-from typing import Optional
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import List, Optional
+from pymongo import ASCENDING
 from celery import current_task
-from app.celery_app import celery_app
+from app.celery_app import celery_app, profile_for_operation
+from app.config import settings
 from app.models import Task, TaskLog, TaskStatus
-from app.database import init_db
+from app.task_logs import TaskLogWriter
+from app.cache import invalidate_tasks
+from app.checkpoints import clear_checkpoint, get_checkpoint, save_checkpoint
+from app.counters import increment_task_counters, reconcile_task_counters
+from app.task_state import transition_task
+from app.retention import task_expiry
+from app.reports import build_report, refresh_rollups
+from app.worker import run_async, run_blocking, task_slot
+from app.metrics import PROCESS_TASK_DURATION
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -18,88 +30,114 @@ def process_task(self, task_id: str, operation: str = "default"):
     """
     Process a task with various operations
     """
-    import asyncio
+    # Only the execution the task was dispatched with may change it
+    execution = {"celery_task_id": self.request.id}
+    outcome = "failed"
     
     async def _process_task_async():
+        nonlocal outcome
+        logs = TaskLogWriter(task_id)
         try:
-            # Initialize database connection
-            await init_db()
+            # Wait for a slot inside the try, so a time limit or shutdown
+            # while waiting still marks the task failed
+            async with task_slot():
+                # Update task status to processing, unless it has already finished
+                # or was dispatched again under another Celery task ID, so
+                # duplicate messages don't process the same task twice
+                claimed = await transition_task(
+                    task_id,
+                    [TaskStatus.PENDING, TaskStatus.PROCESSING],
+                    TaskStatus.PROCESSING,
+                    condition=execution,
+                )
+                if claimed is None:
+                    task = await Task.get(task_id)
+                    if not task:
+                        raise ValueError(f"Task {task_id} not found")
+                    outcome = "skipped"
+                    # self.request is thread-local and empty on the event loop thread
+                    if task.celery_task_id != execution["celery_task_id"]:
+                        logger.warning(
+                            f"Skipping task {task_id}: dispatched as {task.celery_task_id}, not {execution['celery_task_id']}"
+                        )
+                        return None
+                    logger.warning(f"Skipping task {task_id}: already {task.status.value}")
+                    return task.result
+                
+                # Log task start
+                await logs.log(f"Started processing task with operation: {operation}")
+                
+                # Simulate different types of processing based on operation
+                if operation == "data_processing":
+                    result = await _process_data_operation(task_id, logs)
+                elif operation == "file_processing":
+                    result = await _process_file_operation(task_id, logs)
+                elif operation == "email_sending":
+                    result = await _process_email_operation(task_id, logs)
+                else:
+                    result = await _process_default_operation(task_id, logs)
+                
+                # Update task as completed
+                completed_at = datetime.utcnow()
+                completed = await transition_task(
+                    task_id,
+                    [TaskStatus.PROCESSING],
+                    TaskStatus.COMPLETED,
+                    condition=execution,
+                    result=result,
+                    completed_at=completed_at,
+                    expires_at=task_expiry(TaskStatus.COMPLETED.value, completed_at),
+                )
+                if completed is None:
+                    logger.warning(f"Task {task_id} changed while processing, result not stored")
+                
+                # Log completion
+                await logs.log(f"Task completed successfully with result: {result}")
+                
+                outcome = "completed"
+                return result
             
-            # Update task status to processing
-            task = await Task.get(task_id)
-            if not task:
-                raise ValueError(f"Task {task_id} not found")
-            
-            task.status = TaskStatus.PROCESSING
-            task.updated_at = datetime.utcnow()
-            await task.save()
-            
-            # Log task start
-            await TaskLog(
-                task_id=task_id,
-                message=f"Started processing task with operation: {operation}",
-                level="info"
-            ).insert()
-            
-            # Simulate different types of processing based on operation
-            if operation == "data_processing":
-                result = await _process_data_operation(task_id)
-            elif operation == "file_processing":
-                result = await _process_file_operation(task_id)
-            elif operation == "email_sending":
-                result = await _process_email_operation(task_id)
+        except (Exception, asyncio.CancelledError) as e:
+            # run_async cancels the coroutine when a time limit or worker
+            # shutdown interrupts the caller; that is a failure too
+            if isinstance(e, asyncio.CancelledError):
+                error_message = "Task was cancelled by a time limit or worker shutdown"
             else:
-                result = await _process_default_operation(task_id)
-            
-            # Update task as completed
-            task.status = TaskStatus.COMPLETED
-            task.result = result
-            task.completed_at = datetime.utcnow()
-            task.updated_at = datetime.utcnow()
-            await task.save()
-            
-            # Log completion
-            await TaskLog(
-                task_id=task_id,
-                message=f"Task completed successfully with result: {result}",
-                level="info"
-            ).insert()
-            
-            return result
-            
-        except Exception as e:
-            logger.error(f"Error processing task {task_id}: {str(e)}")
+                error_message = str(e)
+            logger.error(f"Error processing task {task_id}: {error_message}")
             
             # Update task as failed
-            task = await Task.get(task_id)
-            if task:
-                task.status = TaskStatus.FAILED
-                task.error_message = str(e)
-                task.updated_at = datetime.utcnow()
-                await task.save()
+            await transition_task(
+                task_id,
+                [TaskStatus.PENDING, TaskStatus.PROCESSING],
+                TaskStatus.FAILED,
+                condition=execution,
+                error_message=error_message,
+                expires_at=task_expiry(TaskStatus.FAILED.value, datetime.utcnow()),
+            )
             
             # Log error
-            await TaskLog(
-                task_id=task_id,
-                message=f"Task failed with error: {str(e)}",
-                level="error"
-            ).insert()
+            await logs.log(f"Task failed with error: {error_message}", level="error")
             
             raise
+        
+        finally:
+            # Write any buffered log entries on completion or failure
+            await logs.flush()
     
-    return asyncio.run(_process_task_async())
+    started = time.perf_counter()
+    try:
+        return run_async(_process_task_async())
+    finally:
+        PROCESS_TASK_DURATION.labels(profile_for_operation(operation), outcome).observe(time.perf_counter() - started)
 
 
-async def _process_data_operation(task_id: str) -> str:
+async def _process_data_operation(task_id: str, logs: TaskLogWriter) -> str:
     """Simulate data processing operation"""
-    await TaskLog(
-        task_id=task_id,
-        message="Starting data processing operation",
-        level="info"
-    ).insert()
+    await logs.log("Starting data processing operation")
     
     # Simulate processing time
-    time.sleep(random.uniform(2, 5))
+    await run_blocking(time.sleep, random.uniform(2, 5))
     
     # Simulate data transformation
     processed_data = {
@@ -108,25 +146,17 @@ async def _process_data_operation(task_id: str) -> str:
         "processing_time_seconds": round(random.uniform(2, 8), 2)
     }
     
-    await TaskLog(
-        task_id=task_id,
-        message=f"Data processing completed: {processed_data}",
-        level="info"
-    ).insert()
+    await logs.log(f"Data processing completed: {processed_data}")
     
     return f"Data processing completed successfully. Processed {processed_data['records_processed']} records."
 
 
-async def _process_file_operation(task_id: str) -> str:
+async def _process_file_operation(task_id: str, logs: TaskLogWriter) -> str:
     """Simulate file processing operation"""
-    await TaskLog(
-        task_id=task_id,
-        message="Starting file processing operation",
-        level="info"
-    ).insert()
+    await logs.log("Starting file processing operation")
     
     # Simulate file operations
-    time.sleep(random.uniform(3, 7))
+    await run_blocking(time.sleep, random.uniform(3, 7))
     
     file_operations = [
         "File validation completed",
@@ -137,26 +167,18 @@ async def _process_file_operation(task_id: str) -> str:
     ]
     
     for operation in file_operations:
-        await TaskLog(
-            task_id=task_id,
-            message=operation,
-            level="info"
-        ).insert()
-        time.sleep(random.uniform(0.5, 1.5))
+        await logs.log(operation)
+        await run_blocking(time.sleep, random.uniform(0.5, 1.5))
     
     return "File processing completed successfully. All operations passed quality checks."
 
 
-async def _process_email_operation(task_id: str) -> str:
+async def _process_email_operation(task_id: str, logs: TaskLogWriter) -> str:
     """Simulate email sending operation"""
-    await TaskLog(
-        task_id=task_id,
-        message="Starting email sending operation",
-        level="info"
-    ).insert()
+    await logs.log("Starting email sending operation")
     
     # Simulate email processing
-    time.sleep(random.uniform(1, 3))
+    await run_blocking(time.sleep, random.uniform(1, 3))
     
     email_data = {
         "recipients": random.randint(10, 100),
@@ -164,71 +186,139 @@ async def _process_email_operation(task_id: str) -> str:
         "delivery_rate": round(random.uniform(95, 99.9), 1)
     }
     
-    await TaskLog(
-        task_id=task_id,
-        message=f"Email campaign completed: {email_data}",
-        level="info"
-    ).insert()
+    await logs.log(f"Email campaign completed: {email_data}")
     
     return f"Email campaign completed. Sent to {email_data['recipients']} recipients with {email_data['delivery_rate']}% delivery rate."
 
 
-async def _process_default_operation(task_id: str) -> str:
+async def _process_default_operation(task_id: str, logs: TaskLogWriter) -> str:
     """Default processing operation"""
-    await TaskLog(
-        task_id=task_id,
-        message="Starting default processing operation",
-        level="info"
-    ).insert()
+    await logs.log("Starting default processing operation")
     
     # Simulate generic processing
-    time.sleep(random.uniform(1, 4))
+    await run_blocking(time.sleep, random.uniform(1, 4))
     
-    await TaskLog(
-        task_id=task_id,
-        message="Default processing completed",
-        level="info"
-    ).insert()
+    await logs.log("Default processing completed")
     
     return "Default processing completed successfully."
 
 
+def cleanup_query(days_old: int) -> dict:
+    """Query matching completed tasks that finished more than days_old days ago"""
+    cutoff_date = datetime.utcnow() - timedelta(days=days_old)
+    return {
+        "status": TaskStatus.COMPLETED.value,
+        "completed_at": {"$lt": cutoff_date},
+    }
+
+
 @celery_app.task(bind=True)
-def cleanup_old_tasks(self, days_old: int = 30):
+def cleanup_old_tasks(self, days_old: int = 30, batch_size: Optional[int] = None, resume: bool = True):
     """
-    Clean up old completed tasks
+    Clean up old completed tasks and their logs in batches
     """
-    import asyncio
+    batch_size = batch_size or settings.cleanup_batch_size
+    checkpoint_name = f"cleanup_old_tasks:{days_old}"
+    
+    async def _delete_batch(batch: List[dict]) -> int:
+        task_ids = [doc["_id"] for doc in batch]
+        
+        # Delete associated logs, then the tasks, one request each per batch
+        await TaskLog.get_motor_collection().delete_many(
+            {"task_id": {"$in": [str(task_id) for task_id in task_ids]}}
+        )
+        result = await Task.get_motor_collection().delete_many(
+            {"_id": {"$in": task_ids}, "status": TaskStatus.COMPLETED.value}
+        )
+        
+        # Counter drift from concurrent changes is fixed by reconcile_counters
+        priorities = Counter(doc.get("priority") for doc in batch)
+        await increment_task_counters(
+            {TaskStatus.COMPLETED: -result.deleted_count},
+            {priority: -count for priority, count in priorities.items() if priority},
+        )
+        await invalidate_tasks(*(str(task_id) for task_id in task_ids))
+        
+        # Record progress so an interrupted run continues after this batch
+        await save_checkpoint(checkpoint_name, last_id=task_ids[-1])
+        return result.deleted_count
     
     async def _cleanup_old_tasks_async():
-        try:
-            await init_db()
-            
-            from datetime import timedelta
-            cutoff_date = datetime.utcnow() - timedelta(days=days_old)
-            
-            # Find old completed tasks
-            old_tasks = await Task.find(
-                Task.status == TaskStatus.COMPLETED,
-                Task.completed_at < cutoff_date
-            ).to_list()
-            
-            deleted_count = 0
-            for task in old_tasks:
-                # Delete associated logs
-                await TaskLog.find(TaskLog.task_id == str(task.id)).delete()
-                # Delete task
-                await task.delete()
-                deleted_count += 1
-            
-            logger.info(f"Cleaned up {deleted_count} old tasks")
-            return f"Cleaned up {deleted_count} old tasks"
-            
-        except Exception as e:
-            logger.error(f"Error cleaning up old tasks: {str(e)}")
-            raise
+        async with task_slot():
+            try:
+                query = cleanup_query(days_old)
+                
+                checkpoint = await get_checkpoint(checkpoint_name) if resume else None
+                if checkpoint:
+                    query["_id"] = {"$gt": checkpoint["last_id"]}
+                    logger.info(f"Resuming cleanup after task {checkpoint['last_id']}")
+                
+                # Stream matching task ids in _id order instead of loading every task
+                cursor = Task.get_motor_collection().find(
+                    query, projection={"_id": 1, "priority": 1}
+                ).sort("_id", ASCENDING).batch_size(batch_size)
+                
+                deleted_count = 0
+                batch = []
+                async for doc in cursor:
+                    batch.append(doc)
+                    if len(batch) >= batch_size:
+                        deleted_count += await _delete_batch(batch)
+                        batch = []
+                        # Leave room for API traffic between batches
+                        await asyncio.sleep(settings.cleanup_batch_pause)
+                
+                if batch:
+                    deleted_count += await _delete_batch(batch)
+                
+                await clear_checkpoint(checkpoint_name)
+                
+                logger.info(f"Cleaned up {deleted_count} old tasks")
+                return f"Cleaned up {deleted_count} old tasks"
+                
+            except Exception as e:
+                logger.error(f"Error cleaning up old tasks: {str(e)}")
+                raise
     
-    return asyncio.run(_cleanup_old_tasks_async())
+    return run_async(_cleanup_old_tasks_async())
+
+
+@celery_app.task(bind=True)
+def reconcile_counters(self):
+    """
+    Recompute the materialized task counters from the tasks collection
+    """
+    async def _reconcile_counters_async():
+        async with task_slot():
+            try:
+                counts = await reconcile_task_counters()
+                logger.info(f"Reconciled task counters: {counts}")
+                return counts
+                
+            except Exception as e:
+                logger.error(f"Error reconciling task counters: {str(e)}")
+                raise
+    
+    return run_async(_reconcile_counters_async())
+
+
+@celery_app.task(bind=True)
+def refresh_task_rollups(self):
+    """
+    Bring the hourly task rollups used by reports up to date
+    """
+    async def _refresh_task_rollups_async():
+        async with task_slot():
+            try:
+                refreshed = await refresh_rollups()
+                logger.info(f"Refreshed {refreshed} hourly task rollups")
+                return f"Refreshed {refreshed} hourly task rollups"
+                
+            except Exception as e:
+                logger.error(f"Error refreshing task rollups: {str(e)}")
+                raise
+    
+    return run_async(_refresh_task_rollups_async())
 
 
 @celery_app.task(bind=True)
@@ -236,54 +326,24 @@ def generate_report(self, report_type: str = "daily"):
     """
     Generate various types of reports
     """
-    import asyncio
-    
     async def _generate_report_async():
-        try:
-            await init_db()
-            
-            await TaskLog(
-                task_id="report_generation",
-                message=f"Starting {report_type} report generation",
-                level="info"
-            ).insert()
+        async with task_slot():
+            logs = TaskLogWriter("report_generation")
+            try:
+                await logs.log(f"Starting {report_type} report generation")
+                
+                # Merge pre-aggregated hourly rollups instead of rescanning tasks
+                report_data = await build_report(report_type)
+                
+                await logs.log(f"{report_type.capitalize()} report generated: {report_data}")
+                
+                return f"{report_type.capitalize()} report generated successfully with {report_data['total_tasks']} total tasks"
+                
+            except Exception as e:
+                logger.error(f"Error generating {report_type} report: {str(e)}")
+                raise
             
-            # Simulate report generation
-            time.sleep(random.uniform(5, 15))
-            
-            if report_type == "daily":
-                report_data = {
-                    "total_tasks": random.randint(50, 200),
-                    "completed_tasks": random.randint(40, 180),
-                    "failed_tasks": random.randint(1, 10),
-                    "avg_processing_time": round(random.uniform(2, 8), 2)
-                }
-            elif report_type == "weekly":
-                report_data = {
-                    "total_tasks": random.randint(300, 1000),
-                    "completed_tasks": random.randint(280, 950),
-                    "failed_tasks": random.randint(5, 30),
-                    "avg_processing_time": round(random.uniform(2, 8), 2),
-                    "peak_hours": ["09:00-11:00", "14:00-16:00"]
-                }
-            else:
-                report_data = {
-                    "total_tasks": random.randint(1000, 5000),
-                    "completed_tasks": random.randint(950, 4800),
-                    "failed_tasks": random.randint(20, 100),
-                    "avg_processing_time": round(random.uniform(2, 8), 2)
-                }
-            
-            await TaskLog(
-                task_id="report_generation",
-                message=f"{report_type.capitalize()} report generated: {report_data}",
-                level="info"
-            ).insert()
-            
-            return f"{report_type.capitalize()} report generated successfully with {report_data['total_tasks']} total tasks"
-            
-        except Exception as e:
-            logger.error(f"Error generating {report_type} report: {str(e)}")
-            raise
+            finally:
+                await logs.flush()
     
-    return asyncio.run(_generate_report_async()) 
\ No newline at end of file
+    return run_async(_generate_report_async()) 
\ No newline at end of file
@@ -0,0 +1,166 @@
+import asyncio
+import functools
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Coroutine, Dict, Optional
+from celery.signals import (
+    task_postrun,
+    task_prerun,
+    worker_process_init,
+    worker_process_shutdown,
+    worker_ready,
+    worker_shutdown,
+)
+from app.config import settings
+from app.database import init_db, close_db
+from app.counters import ensure_task_counters
+from app.metrics import CELERY_TASK_DURATION, mark_process_dead, start_worker_exporter
+from app.redis_client import close_redis
+
+logger = logging.getLogger(__name__)
+
+# Event loop owned by this worker process, running in its own thread and
+# shared by every task the process executes (one at a time for prefork,
+# many at once for the threads pool)
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_loop_thread: Optional[threading.Thread] = None
+_loop_lock = threading.Lock()
+
+# Bounds how many task coroutines run on the loop at the same time; only
+# touched from the loop thread
+_task_semaphore: Optional[asyncio.Semaphore] = None
+
+
+def get_worker_loop() -> asyncio.AbstractEventLoop:
+    """Get the worker process event loop, starting it and the database client on first use"""
+    global _loop, _loop_thread
+
+    with _loop_lock:
+        if _loop is not None and not _loop.is_closed():
+            return _loop
+
+        loop = asyncio.new_event_loop()
+        loop.set_default_executor(
+            ThreadPoolExecutor(
+                max_workers=settings.worker_blocking_threads,
+                thread_name_prefix="worker-blocking",
+            )
+        )
+
+        thread = threading.Thread(target=loop.run_forever, name="worker-event-loop", daemon=True)
+        thread.start()
+
+        asyncio.run_coroutine_threadsafe(init_db(), loop).result()
+        asyncio.run_coroutine_threadsafe(ensure_task_counters(), loop).result()
+
+        _loop = loop
+        _loop_thread = thread
+        return _loop
+
+
+def task_slot() -> asyncio.Semaphore:
+    """
+    Semaphore bounding how many task coroutines run on the loop at once.
+
+    Task coroutines acquire it themselves, so one cancelled while still
+    waiting for a slot has already started and can clean up after itself.
+    """
+    global _task_semaphore
+
+    if _task_semaphore is None:
+        _task_semaphore = asyncio.Semaphore(settings.worker_max_concurrent_tasks)
+
+    return _task_semaphore
+
+
+def run_async(coro: Coroutine[Any, Any, Any]) -> Any:
+    """Run a task coroutine on the worker process event loop and wait for its result"""
+    future = asyncio.run_coroutine_threadsafe(coro, get_worker_loop())
+    try:
+        return future.result()
+    except BaseException:
+        # Time limits and worker shutdown interrupt the calling thread only
+        future.cancel()
+        raise
+
+
+async def run_blocking(func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """Run a blocking call in the worker thread pool without stalling the event loop"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, functools.partial(func, *args, **kwargs))
+
+
+def shutdown_worker_loop():
+    """Close the database client and stop the worker process event loop"""
+    global _loop, _loop_thread, _task_semaphore
+
+    with _loop_lock:
+        if _loop is None or _loop.is_closed():
+            return
+
+        loop, thread = _loop, _loop_thread
+        try:
+            asyncio.run_coroutine_threadsafe(close_redis(), loop).result()
+            asyncio.run_coroutine_threadsafe(close_db(), loop).result()
+            asyncio.run_coroutine_threadsafe(loop.shutdown_asyncgens(), loop).result()
+            asyncio.run_coroutine_threadsafe(loop.shutdown_default_executor(), loop).result()
+        finally:
+            loop.call_soon_threadsafe(loop.stop)
+            if thread is not None:
+                thread.join()
+            loop.close()
+            _loop = None
+            _loop_thread = None
+            _task_semaphore = None
+
+
+@worker_ready.connect
+def _start_metrics_exporter(sender: Any = None, **kwargs):
+    """Start the metrics exporter in the main worker process once the pool is running"""
+    if settings.metrics_enabled and settings.metrics_worker_port:
+        pool = getattr(sender, "pool", None)
+        start_worker_exporter(
+            settings.metrics_worker_port,
+            multiprocess_pool=type(pool).__module__.endswith(".prefork"),
+        )
+
+
+@worker_process_init.connect
+def _init_worker_process(**kwargs):
+    """Create the event loop and database client when a pool process starts"""
+    # Prefork children must not reuse a client created in the parent process
+    get_worker_loop()
+    logger.info("Worker process event loop and database client initialized")
+
+
+@worker_process_shutdown.connect
+def _shutdown_worker_process(**kwargs):
+    """Release the event loop and database client when a pool process exits"""
+    shutdown_worker_loop()
+    mark_process_dead(os.getpid())
+
+
+@worker_shutdown.connect
+def _shutdown_worker(**kwargs):
+    """Release the event loop for solo and threads pools, which run tasks in the main process"""
+    shutdown_worker_loop()
+
+
+# Start times of running tasks, by Celery task ID
+_task_started: Dict[str, float] = {}
+
+
+@task_prerun.connect
+def _record_task_start(task_id: Optional[str] = None, **kwargs):
+    _task_started[task_id] = time.perf_counter()
+
+
+@task_postrun.connect
+def _record_task_duration(task_id: Optional[str] = None, task: Any = None, state: Optional[str] = None, **kwargs):
+    """Time every task the worker runs, labeled by task name and final state"""
+    started = _task_started.pop(task_id, None)
+    if started is not None and task is not None:
+        CELERY_TASK_DURATION.labels(task.name, state or "UNKNOWN").observe(time.perf_counter() - started)
\ No newline at end of file
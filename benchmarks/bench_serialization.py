@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Benchmark the GET /tasks/ response path, per row, before and after the
+orjson fast path.
+
+before: Beanie documents dumped per row, FastAPI response_model validation, JSONResponse
+after:  raw Motor dicts, one validation pass, ORJSONResponse
+
+Needs a running MongoDB (MONGODB_URL). Rows are seeded into a separate
+database, fastapi_celery_demo_bench, which is dropped afterwards.
+
+    python benchmarks/bench_serialization.py --rows 100 --repeat 200
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Never touch the application database
+os.environ["DATABASE_NAME"] = "fastapi_celery_demo_bench"
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+from app.config import settings
+from app.database import close_db, get_client, init_db
+from app.models import Task, TaskPriority, TaskStatus
+from app.pagination import KEYSET_SORT
+from app.schemas import TaskListResponse
+from app.serialization import from_mongo, validated_response
+
+LIST_FIELD = create_response_field(name="Response_get_tasks", type_=TaskListResponse)
+
+
+async def seed(rows: int):
+    now = datetime.utcnow()
+    statuses = list(TaskStatus)
+    priorities = list(TaskPriority)
+    await Task.insert_many([
+        Task(
+            title=f"Benchmark task {i}",
+            description="Seeded by bench_serialization.py",
+            status=statuses[i % len(statuses)],
+            priority=priorities[i % len(priorities)],
+            result="Processed 1000 records" if i % 4 == 2 else None,
+            created_at=now - timedelta(seconds=i),
+            updated_at=now - timedelta(seconds=i),
+        )
+        for i in range(rows)
+    ])
+
+
+async def fetch_documents(rows: int):
+    return await Task.find().sort("-created_at", "-_id").limit(rows).to_list()
+
+
+async def fetch_raw(rows: int):
+    return await Task.get_motor_collection().find().sort(KEYSET_SORT).limit(rows).to_list(None)
+
+
+async def encode_before(tasks) -> bytes:
+    # The schema's id is a str, so each document is dumped with its ObjectId
+    # converted, as a handler returning Beanie documents would have to
+    items = [{**task.model_dump(), "id": str(task.id)} for task in tasks]
+    content = await serialize_response(
+        field=LIST_FIELD, response_content={"items": items, "next_cursor": None}, is_coroutine=True
+    )
+    return JSONResponse(content).body
+
+
+async def encode_after(docs) -> bytes:
+    items = [from_mongo(dict(doc)) for doc in docs]
+    return validated_response(TaskListResponse, {"items": items, "next_cursor": None}).body
+
+
+async def best_of(repeat: int, func, *args) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        await func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+async def main(rows: int, repeat: int):
+    await init_db()
+    try:
+        await seed(rows)
+
+        async def before():
+            await encode_before(await fetch_documents(rows))
+
+        async def after():
+            await encode_after(await fetch_raw(rows))
+
+        documents = await fetch_documents(rows)
+        raw = await fetch_raw(rows)
+
+        results = [
+            ("encode only", await best_of(repeat, encode_before, documents), await best_of(repeat, encode_after, raw)),
+            ("read + encode", await best_of(repeat, before), await best_of(repeat, after)),
+        ]
+
+        print(f"{rows} rows, best of {repeat} runs, microseconds per row")
+        print(f"{'':<16}{'before':>10}{'after':>10}{'speedup':>10}")
+        for name, old, new in results:
+            print(f"{name:<16}{old / rows * 1e6:>10.1f}{new / rows * 1e6:>10.1f}{old / new:>9.1f}x")
+    finally:
+        await get_client().drop_database(settings.database_name)
+        await close_db()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100, help="Rows per response")
+    parser.add_argument("--repeat", type=int, default=200, help="Runs per measurement")
+    args = parser.parse_args()
+
+    asyncio.run(main(args.rows, args.repeat))
\ No newline at end of file
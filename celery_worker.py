@@ -1,8 +1,39 @@
 #!/usr/bin/env python3
 """
 Celery Worker for FastAPI Celery MongoDB Demo
+
+Without arguments this behaves like the celery command. With --profile it
+starts a worker pool for one queue profile from app/celery_app.py, using
+that profile's queues, concurrency, prefetch and max_tasks_per_child.
 """
-from app.celery_app import celery_app
+import argparse
+import sys
+from app.celery_app import celery_app, QUEUE_PROFILES, profile_queues
+
+
+def worker_argv(profile_name, priorities=None, extra_args=None):
+    """Build celery worker arguments for a queue profile"""
+    profile = QUEUE_PROFILES[profile_name]
+    return [
+        "worker",
+        "-Q", ",".join(profile_queues(profile_name, priorities)),
+        "-n", f"{profile_name}@%h",
+        f"--concurrency={profile['concurrency']}",
+        f"--prefetch-multiplier={profile['prefetch_multiplier']}",
+        f"--max-tasks-per-child={profile['max_tasks_per_child']}",
+        "--loglevel=info",
+        *(extra_args or []),
+    ]
+
 
 if __name__ == "__main__":
-    celery_app.start() 
\ No newline at end of file
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--profile", choices=sorted(QUEUE_PROFILES), help="Queue profile to run a worker pool for")
+    parser.add_argument("--priorities", help="Comma-separated task priorities to consume, e.g. high")
+    args, extra_args = parser.parse_known_args()
+
+    if args.profile:
+        priorities = args.priorities.split(",") if args.priorities else None
+        celery_app.worker_main(worker_argv(args.profile, priorities, extra_args))
+    else:
+        celery_app.start(sys.argv[1:] or None)
\ No newline at end of file
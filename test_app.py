@@ -80,6 +80,159 @@ def test_create_task():
         print(f"❌ Task creation error: {e}")
         return None
 
+def test_create_tasks_bulk():
+    """Test bulk task creation"""
+    print("Testing bulk task creation...")
+    bulk_data = {
+        "tasks": [
+            {"title": f"Bulk Task {i}", "description": "Created by the bulk endpoint", "priority": priority}
+            for i, priority in enumerate(["low", "medium", "high"])
+        ]
+    }
+    
+    try:
+        response = requests.post(f"{BASE_URL}/tasks/bulk", json=bulk_data)
+        
+        if response.status_code == 200:
+            task_ids = [task["id"] for task in response.json()["items"]]
+            print(f"✅ Bulk tasks created: {len(task_ids)}")
+            return task_ids
+        else:
+            print(f"❌ Bulk task creation failed: {response.status_code} - {response.text}")
+            return []
+    except Exception as e:
+        print(f"❌ Bulk task creation error: {e}")
+        return []
+
+def test_list_tasks_paginated():
+    """Test keyset pagination of the task list"""
+    print("Testing paginated task listing...")
+    
+    try:
+        seen = []
+        cursor = None
+        while True:
+            params = {"limit": 2, "fields": "id,title,status"}
+            if cursor:
+                params["cursor"] = cursor
+            response = requests.get(f"{BASE_URL}/tasks/", params=params)
+            if response.status_code != 200:
+                print(f"❌ Task listing failed: {response.status_code} - {response.text}")
+                return False
+            
+            page = response.json()
+            seen.extend(task["id"] for task in page["items"])
+            cursor = page["next_cursor"]
+            if not cursor:
+                break
+        
+        if len(seen) != len(set(seen)):
+            print("❌ Task listing returned a task twice")
+            return False
+        print(f"✅ Listed {len(seen)} tasks, 2 per page")
+        return True
+    except Exception as e:
+        print(f"❌ Task listing error: {e}")
+        return False
+
+def test_update_task(task_id):
+    """Test task update, including rejecting null for a required field"""
+    print(f"Testing task update for task {task_id}...")
+    
+    try:
+        response = requests.put(f"{BASE_URL}/tasks/{task_id}", json={"priority": "high"})
+        if response.status_code != 200 or response.json()["priority"] != "high":
+            print(f"❌ Task update failed: {response.status_code} - {response.text}")
+            return False
+        print("✅ Task updated")
+        
+        response = requests.put(f"{BASE_URL}/tasks/{task_id}", json={"priority": None})
+        if response.status_code != 422:
+            print(f"❌ Null priority was not rejected: {response.status_code} - {response.text}")
+            return False
+        print("✅ Null priority rejected")
+        return True
+    except Exception as e:
+        print(f"❌ Task update error: {e}")
+        return False
+
+def test_process_batch(task_ids):
+    """Test dispatching several tasks in one request"""
+    print(f"Testing batch processing for {len(task_ids)} tasks...")
+    
+    try:
+        response = requests.post(
+            f"{BASE_URL}/tasks/process-batch",
+            json={"task_ids": task_ids + ["not-an-id"], "operation": "email_sending"}
+        )
+        
+        if response.status_code == 200:
+            result = response.json()
+            statuses = [item["status"] for item in result["results"]]
+            print(f"✅ Batch dispatched {result['dispatched']} tasks: {statuses}")
+            
+            # Already claimed tasks must not be dispatched twice
+            response = requests.post(f"{BASE_URL}/tasks/process-batch", json={"task_ids": task_ids})
+            if response.status_code == 200 and response.json()["dispatched"] == 0:
+                print("✅ Repeated batch dispatched nothing")
+                return True
+            print(f"❌ Repeated batch dispatched again: {response.status_code} - {response.text}")
+            return False
+        else:
+            print(f"❌ Batch processing failed: {response.status_code} - {response.text}")
+            return False
+    except Exception as e:
+        print(f"❌ Batch processing error: {e}")
+        return False
+
+def test_user_duplicates(user_id):
+    """Test that duplicate usernames and emails are rejected"""
+    print("Testing user duplicates...")
+    suffix = int(time.time())
+    
+    try:
+        # Same username and email as test_create_user
+        response = requests.post(
+            f"{BASE_URL}/users/",
+            json={"username": "test_user", "email": "test@example.com", "full_name": "Test User"}
+        )
+        if response.status_code != 400:
+            print(f"❌ Duplicate user was not rejected: {response.status_code} - {response.text}")
+            return False
+        print(f"✅ Duplicate user rejected: {response.json()['detail']}")
+        
+        # One new user, the same user again, and an existing username
+        new_user = {"username": f"bulk_user_{suffix}", "email": f"bulk_{suffix}@example.com", "full_name": "Bulk User"}
+        response = requests.post(
+            f"{BASE_URL}/users/bulk",
+            json={"users": [
+                new_user,
+                new_user,
+                {"username": "test_user", "email": f"other_{suffix}@example.com", "full_name": "Other User"},
+            ]}
+        )
+        if response.status_code != 200:
+            print(f"❌ Bulk user creation failed: {response.status_code} - {response.text}")
+            return False
+        statuses = [item["status"] for item in response.json()["results"]]
+        if statuses != ["created", "duplicate", "duplicate"]:
+            print(f"❌ Unexpected bulk user results: {statuses}")
+            return False
+        print(f"✅ Bulk users: {statuses}")
+        
+        # Taking another user's email
+        if user_id:
+            response = requests.put(f"{BASE_URL}/users/{user_id}", json={"email": new_user["email"]})
+            if response.status_code != 400:
+                print(f"❌ Duplicate email update was not rejected: {response.status_code} - {response.text}")
+                return False
+            print(f"✅ Duplicate email update rejected: {response.json()['detail']}")
+        
+        return True
+    except Exception as e:
+        print(f"❌ User duplicates error: {e}")
+        return False
+
 def test_start_task_processing(task_id):
     """Test task processing"""
     print(f"Testing task processing for task {task_id}...")
@@ -123,11 +276,23 @@ def test_get_task_with_logs(task_id):
     print(f"Testing task with logs for task {task_id}...")
     
     try:
-        response = requests.get(f"{BASE_URL}/tasks/{task_id}/with-logs")
+        response = requests.get(f"{BASE_URL}/tasks/{task_id}/with-logs?limit=2")
         
         if response.status_code == 200:
             task = response.json()
             print(f"✅ Task with logs retrieved: {len(task.get('logs', []))} logs")
+            
+            # Follow next_logs_cursor to the end
+            pages = 1
+            cursor = task.get("next_logs_cursor")
+            while cursor:
+                response = requests.get(f"{BASE_URL}/tasks/{task_id}/with-logs", params={"limit": 2, "cursor": cursor})
+                if response.status_code != 200:
+                    print(f"❌ Task logs page failed: {response.status_code} - {response.text}")
+                    return False
+                cursor = response.json().get("next_logs_cursor")
+                pages += 1
+            print(f"✅ Task logs read in {pages} page(s)")
             return True
         else:
             print(f"❌ Task with logs failed: {response.status_code} - {response.text}")
@@ -193,9 +358,27 @@ def main():
     
     print("\n" + "=" * 50)
     
+    # Test duplicate usernames and emails
+    test_user_duplicates(user_id)
+    
+    print("\n" + "=" * 50)
+    
     # Test task creation
     task_id = test_create_task()
     
+    print("\n" + "=" * 50)
+    
+    # Test bulk creation, paginated listing and updates
+    bulk_task_ids = test_create_tasks_bulk()
+    test_list_tasks_paginated()
+    if bulk_task_ids:
+        test_update_task(bulk_task_ids[0])
+        
+        print("\n" + "=" * 50)
+        
+        # Test batch processing
+        test_process_batch(bulk_task_ids)
+    
     if task_id:
         print("\n" + "=" * 50)
         